@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: lookup latency of the --serve daemon.
+
+Starts merge_vcards --serve on a synthetic corpus, then sends query requests
+for cards of the corpus, one at a time over a single connection, on the Unix
+socket and on localhost HTTP (keep-alive). Prints p50/p99 latency per
+transport next to what one lookup costs without the daemon: a full
+--stats-only CLI run over the same corpus.
+
+    python benchmarks/bench_daemon.py --cards 100000 --queries 2000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, '..', 'merge_vcards.py')
+sys.path.insert(0, HERE)
+
+from make_corpus import write_corpus  # noqa: E402
+
+
+def start_daemon(corpus, address):
+    """Run the daemon and wait until it has loaded the corpus; returns (process, load seconds)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, SCRIPT, '-i', corpus, '--no-gui', '--serve', address],
+                            stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        if line.startswith('Serving'):
+            return proc, time.perf_counter() - start
+    raise RuntimeError(f"Daemon on {address} exited with status {proc.wait()}")
+
+
+def stop_daemon(proc):
+    proc.send_signal(2)  # Ctrl+C: the daemon removes its socket on the way out
+    proc.communicate()
+
+
+def unix_latencies(path, requests):
+    times = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        stream = sock.makefile('rwb')
+        for body in requests:
+            start = time.perf_counter()
+            stream.write(body + b'\n')
+            stream.flush()
+            stream.readline()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def http_latencies(port, requests):
+    times = []
+    conn = http.client.HTTPConnection('localhost', port)
+    for body in requests:
+        start = time.perf_counter()
+        conn.request('POST', '/query', body=body, headers={'Content-Type': 'application/json'})
+        conn.getresponse().read()
+        times.append(time.perf_counter() - start)
+    conn.close()
+    return times
+
+
+def percentile(times, q):
+    return sorted(times)[min(len(times) - 1, int(len(times) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--repeat', type=int, default=3, help='CLI runs timed for the no-daemon baseline')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'corpus.vcf')
+        write_corpus(corpus, args.cards)
+        with open(corpus, encoding='utf-8', newline='') as f:
+            cards = [text + 'END:VCARD\r\n' for text in f.read().split('END:VCARD\r\n')[:-1]]
+        rnd = random.Random(1)
+        requests = [json.dumps({'op': 'query', 'vcard': rnd.choice(cards)}).encode('utf-8')
+                    for _ in range(args.queries)]
+
+        rows = []
+        sock_path = os.path.join(tmp, 'daemon.sock')
+        proc, load_seconds = start_daemon(corpus, 'unix:' + sock_path)
+        try:
+            rows.append(('unix socket', unix_latencies(sock_path, requests)))
+        finally:
+            stop_daemon(proc)
+        proc, _ = start_daemon(corpus, f'localhost:{args.port}')
+        try:
+            # HTTP bodies carry no op field: the path selects it
+            rows.append(('http keep-alive', http_latencies(args.port, requests)))
+        finally:
+            stop_daemon(proc)
+
+        cli = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, SCRIPT, '-i', corpus, '--no-gui', '--stats-only'], check=True,
+                           stdout=subprocess.DEVNULL)
+            cli.append(time.perf_counter() - start)
+
+    print(f"{'lookup':>16} {'p50 ms':>9} {'p99 ms':>9} {'lookups/sec':>12}")
+    for name, times in rows:
+        print(f"{name:>16} {percentile(times, 0.5) * 1000:>9.3f} {percentile(times, 0.99) * 1000:>9.3f} "
+              f"{len(times) / sum(times):>12,.0f}")
+    cli_median = statistics.median(cli)
+    print(f"{'CLI run':>16} {cli_median * 1000:>9.0f} {max(cli) * 1000:>9.0f} {1 / cli_median:>12,.2f}")
+    print(f"{args.cards} cards, {args.queries} queries per transport; the daemon loads them once in "
+          f"{load_seconds:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
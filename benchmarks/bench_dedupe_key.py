@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: composite dedupe key extraction in find_duplicates.
+
+Compares the compiled single-pass key function against the original
+per-field dispatch, which walks the vobject card's children once per key
+field, and against the same per-field dispatch over Contact records.
+Runs 1-, 3- and 5-field keys.
+
+    python benchmarks/bench_dedupe_key.py --cards 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from merge_vcards import Contact, compile_key_function, component_from_tokens, tokenize_vcard  # noqa: E402
+
+KEYS = {
+    1: ['FN'],
+    3: ['FN', 'EMAIL', 'ORG'],
+    5: ['FN', 'EMAIL', 'TEL', 'ORG', 'TITLE'],
+}
+
+
+def make_contacts(n, seed=1):
+    rnd = random.Random(seed)
+    contacts = []
+    for i in range(n):
+        name = f"Person {rnd.randrange(n // 3 + 1)}"
+        lines = ['BEGIN:VCARD', 'VERSION:3.0', f'FN:{name}', f'N:{name};;;;']
+        for j in range(rnd.randint(0, 3)):
+            lines.append(f'EMAIL;TYPE=INTERNET:p{i}.{j}@example.com')
+        for j in range(rnd.randint(0, 3)):
+            lines.append(f'TEL;TYPE=CELL:+1 555 {rnd.randrange(10**7):07d}')
+        lines += [f'ORG:Company {rnd.randrange(50)}', f'TITLE:Title {rnd.randrange(20)}',
+                  'NOTE:Lorem ipsum dolor sit amet', 'END:VCARD']
+        text = '\n'.join(lines) + '\n'
+        contacts.append(Contact.from_tokens(tokenize_vcard(text), text))
+    return contacts
+
+
+def vobject_key(card, norm_fields):
+    """The original find_duplicates loop: one getChildren() walk per field."""
+    key_parts = []
+    for field in norm_fields:
+        if field == 'FN':
+            fn = getattr(card, 'fn', None)
+            key_parts.append(fn.value.strip() if fn else '')
+        elif field in ('EMAIL', 'TEL'):
+            values = []
+            for child in card.getChildren():
+                if child.name == field:
+                    val = getattr(child, 'value', '')
+                    if isinstance(val, str):
+                        val_norm = val.strip().lower()
+                        if field == 'TEL':
+                            digits = ''.join(ch for ch in val_norm if ch.isdigit())
+                            if digits:
+                                val_norm = digits
+                        values.append(val_norm)
+            if values:
+                values = sorted(set(values))
+            key_parts.append('|'.join(values))
+        else:
+            values = []
+            for child in card.getChildren():
+                if child.name == field:
+                    val = getattr(child, 'value', '')
+                    if isinstance(val, str):
+                        values.append(val.strip())
+            key_parts.append(values[0] if values else '')
+    return '||'.join(key_parts).lower()
+
+
+def legacy_key(card, norm_fields):
+    """Per-field dispatch over a Contact: one pass over the properties per other field."""
+    key_parts = []
+    for field in norm_fields:
+        if field == 'FN':
+            key_parts.append(card.fn)
+        elif field == 'EMAIL':
+            key_parts.append('|'.join(sorted(set(card.emails))))
+        elif field == 'TEL':
+            key_parts.append('|'.join(sorted(set(card.tels))))
+        else:
+            values = [v.strip() for _g, n, _p, v in card.props if n == field and isinstance(v, str)]
+            key_parts.append(values[0] if values else '')
+    return '||'.join(key_parts).lower()
+
+
+def rate(fn, contacts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for card in contacts:
+            fn(card)
+        best = min(best, time.perf_counter() - start)
+    return len(contacts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.cards)
+    cards = [component_from_tokens(tokenize_vcard(c.raw)) for c in contacts]
+    print(f"{'fields':>6} {'vobject per-field':>18} {'Contact per-field':>18} "
+          f"{'compiled':>10} {'vs vobject':>11} {'vs per-field':>13}")
+    for n_fields, fields in KEYS.items():
+        compiled = compile_key_function(fields)
+        assert all(compiled(c) == legacy_key(c, fields) == vobject_key(v, fields)
+                   for c, v in zip(contacts[:1000], cards))
+        old_vobject = rate(lambda v: vobject_key(v, fields), cards, args.repeat)
+        old = rate(lambda c: legacy_key(c, fields), contacts, args.repeat)
+        new = rate(compiled, contacts, args.repeat)
+        print(f"{n_fields:>6} {old_vobject:>18,.0f} {old:>18,.0f} {new:>10,.0f} "
+              f"{new / old_vobject:>10.1f}x {new / old:>12.2f}x")
+    print("(cards/sec, best of --repeat runs)")
+
+
+if __name__ == '__main__':
+    main()
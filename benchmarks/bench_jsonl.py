@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: JSON Lines output and input.
+
+Writes the same cards with save_jsonl (records built from the C string
+encoder, ~1 MB blocks), with a json.dumps() call and a write per card, and
+with save_vcards, with a plain file copy of the .vcf as the floor. Then
+reads both files back with iter_vcards.
+
+    python benchmarks/bench_jsonl.py --cards 100000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_save_vcards import make_contacts  # noqa: E402
+from merge_vcards import format_vcard, iter_vcards, save_jsonl, save_vcards  # noqa: E402
+
+
+def dumps_save(contacts, filename):
+    """The obvious writer: one dict, json.dumps() and write per card."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for c in contacts:
+            record = {'fn': c.fn, 'emails': list(dict.fromkeys(c.emails)), 'tels': list(dict.fromkeys(c.tels)),
+                      'vcard': format_vcard(c)}
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--merged', type=float, default=0.1, help='Fraction of cards with appended properties')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.cards, args.merged)
+    with tempfile.TemporaryDirectory() as tmp:
+        vcf = os.path.join(tmp, 'out.vcf')
+        jsonl = os.path.join(tmp, 'out.jsonl')
+        save_vcards(contacts, vcf)
+        rows = [
+            ('write', 'file copy', best_time(lambda: shutil.copyfile(vcf, os.path.join(tmp, 'copy')), args.repeat)),
+            ('write', 'save_vcards', best_time(lambda: save_vcards(contacts, vcf), args.repeat)),
+            ('write', 'save_jsonl', best_time(lambda: save_jsonl(contacts, jsonl), args.repeat)),
+            ('write', 'json.dumps per card', best_time(lambda: dumps_save(contacts, jsonl), args.repeat)),
+        ]
+        save_jsonl(contacts, jsonl)
+        for fmt, path in (('vcf', vcf), ('jsonl', jsonl)):
+            read = lambda: sum(1 for _ in iter_vcards(path, Counter(), input_format=fmt))
+            rows.append(('read', f'iter_vcards {fmt}', best_time(read, args.repeat)))
+        sizes = {'vcf': os.path.getsize(vcf), 'jsonl': os.path.getsize(jsonl)}
+    print(f"{'':>5} {'path':>20} {'seconds':>9} {'cards/sec':>12}")
+    for stage, name, seconds in rows:
+        print(f"{stage:>5} {name:>20} {seconds:>9.3f} {args.cards / seconds:>12,.0f}")
+    print(f"File sizes: vcf {sizes['vcf'] / 1e6:.1f} MB, jsonl {sizes['jsonl'] / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: merge_contacts serial vs across a process pool (--jobs).
+
+Loads and groups a synthetic corpus with many duplicate groups, then times
+merge_contacts with jobs=1 and with each --jobs value on freshly loaded
+cards (plain cards are tokenized during the merge, by the parent or by
+the workers). Also checks that every run produced the serial output.
+
+    python benchmarks/bench_merge_parallel.py --cards 200000 --jobs 2,4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from make_corpus import write_corpus  # noqa: E402
+from merge_vcards import find_duplicates, iter_vcards, merge_contacts, render_vcards  # noqa: E402
+
+
+def best_time(corpus, jobs, repeat):
+    """Fastest of repeat merges, each on a fresh load; returns (seconds, rendered output)."""
+    best = float('inf')
+    for _ in range(repeat):
+        groups = find_duplicates(iter_vcards(corpus, Counter()), ['FN'])
+        log = []
+        start = time.perf_counter()
+        merged, _ = merge_contacts(groups, safe_merge=True, merge_log=log, jobs=jobs)
+        best = min(best, time.perf_counter() - start)
+    return best, render_vcards(merged) + '\n'.join(log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=200000)
+    parser.add_argument('--dup-ratio', type=float, default=0.6)
+    parser.add_argument('--jobs', default='2,4', help='Comma-separated worker counts (0 = one per CPU)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'corpus.vcf')
+        summary = write_corpus(corpus, args.cards, dup_ratio=args.dup_ratio, group_sizes='uniform:2-8')
+        serial, expected = best_time(corpus, 1, args.repeat)
+        rows = [(1, serial, True)]
+        for jobs in (int(j) for j in args.jobs.split(',') if j.strip()):
+            seconds, output = best_time(corpus, jobs, args.repeat)
+            rows.append((jobs, seconds, output == expected))
+
+    print(f"{'jobs':>5} {'seconds':>9} {'speedup':>8} {'same output':>12}")
+    for jobs, seconds, same in rows:
+        print(f"{jobs:>5} {seconds:>9.3f} {serial / seconds:>7.2f}x {str(same):>12}")
+    print(f"{args.cards} cards, {summary['duplicate_groups']} duplicate groups; {os.cpu_count()} CPUs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: CSV export with save_csv.
+
+Compares the compiled single-pass row extractor with batched writerows
+against the original per-card card_to_csv_row over vobject trees (one
+getChildren() walk per column), with save_vcards on the same cards as the
+reference the CSV export should keep up with.
+
+    python benchmarks/bench_save_csv.py --cards 100000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_save_vcards import make_contacts  # noqa: E402
+from merge_vcards import normalize_tel, save_csv, save_vcards  # noqa: E402
+
+FIELDS = {
+    'default': ['FN', 'EMAIL', 'TEL', 'ORG', 'TITLE'],
+    'wide': ['FN', 'N', 'EMAIL', 'TEL', 'ORG', 'TITLE', 'ADR', 'URL', 'NOTE', 'BDAY'],
+}
+
+
+def extract_property_values(card, prop_name):
+    """Values of every prop_name property of a vobject card (part of the original export)."""
+    prop_name = prop_name.upper()
+    values = []
+    for child in card.getChildren():
+        if child.name == prop_name:
+            val = getattr(child, 'value', '')
+            if isinstance(val, str):
+                values.append(val.strip())
+            else:
+                try:
+                    values.append(str(val))
+                except Exception:
+                    pass
+    return values
+
+
+def card_to_csv_row(card, field_order):
+    """The original CSV row of a vobject card: one getChildren() walk per column."""
+    row = []
+    fn_val = getattr(card, 'fn', None)
+    for field in field_order:
+        f_upper = field.upper()
+        if f_upper == 'FN':
+            row.append(fn_val.value.strip() if fn_val else '')
+        elif f_upper == 'N':
+            # Structured name; join components with space
+            n_obj = getattr(card, 'n', None)
+            if n_obj and hasattr(n_obj, 'value'):
+                try:
+                    parts = [p for p in n_obj.value if p]
+                    row.append(' '.join(parts))
+                except Exception:
+                    row.append(str(n_obj.value))
+            else:
+                row.append('')
+        else:
+            vals = extract_property_values(card, f_upper)
+            if f_upper == 'TEL':
+                # Normalize phone digits for consistency but keep original display if needed
+                normed = []
+                for v in vals:
+                    digits = normalize_tel(v)
+                    normed.append(digits if digits.isdigit() else v)
+                vals = normed
+            row.append(';'.join(dict.fromkeys(vals)))  # preserve order remove dup
+    return row
+
+
+def vobject_save_csv(contacts, filename, fields):
+    """The original export: a vobject tree and card_to_csv_row per card."""
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for contact in contacts:
+            writer.writerow(card_to_csv_row(contact.to_vcard(), fields))
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--merged', type=float, default=0.1, help='Fraction of cards with appended properties')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.cards, args.merged)
+    # The original path builds a vobject tree per card; time it on a sample
+    sample = contacts[:max(1, args.cards // 20)]
+    with tempfile.TemporaryDirectory() as tmp:
+        out_vcf = os.path.join(tmp, 'out.vcf')
+        out_csv = os.path.join(tmp, 'out.csv')
+        vcf = best_time(lambda: save_vcards(contacts, out_vcf), args.repeat)
+        print(f"{'columns':>8} {'vobject rows/s':>15} {'save_csv rows/s':>16} {'save_vcards cards/s':>20} {'csv/vcf time':>13}")
+        for name, fields in FIELDS.items():
+            old = best_time(lambda: vobject_save_csv(sample, out_csv, fields), 1)
+            new = best_time(lambda: save_csv(contacts, out_csv, fields), args.repeat)
+            print(f"{name:>8} {len(sample) / old:>15,.0f} {len(contacts) / new:>16,.0f} "
+                  f"{len(contacts) / vcf:>20,.0f} {new / vcf:>12.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: writing cards with save_vcards.
+
+Compares the direct writer (original text for untouched cards, the property
+serializer for merged ones, one large buffered write per MB) against the
+original per-card vobject serialize() loop, with a plain file copy of the
+input as the floor. Run with --merged to make that fraction of the cards
+carry appended properties.
+
+    python benchmarks/bench_save_vcards.py --cards 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from merge_vcards import Contact, save_vcards, tokenize_vcard  # noqa: E402
+
+
+def make_contacts(n, merged_ratio, seed=1):
+    rnd = random.Random(seed)
+    contacts = []
+    for i in range(n):
+        lines = ['BEGIN:VCARD', 'VERSION:3.0', f'FN:Person {i}', f'N:{i};Person;;;']
+        for j in range(rnd.randint(1, 3)):
+            lines.append(f'EMAIL;TYPE=INTERNET:p{i}.{j}@example.com')
+        for j in range(rnd.randint(1, 3)):
+            lines.append(f'TEL;TYPE=CELL:+1 555 {rnd.randrange(10**7):07d}')
+        lines += [f'ADR;TYPE=HOME:;;{i} Main St;Town;ST;12345;US', f'ORG:Company {rnd.randrange(50)};Sales',
+                  'NOTE:Lorem ipsum dolor sit amet\\, consectetur adipiscing elit', 'END:VCARD']
+        text = '\n'.join(lines) + '\n'
+        contact = Contact.from_tokens(tokenize_vcard(text), text)
+        if rnd.random() < merged_ratio:
+            added = ((None, 'EMAIL', (('TYPE', 'INTERNET'),), f'other{i}@example.com'),
+                     (None, 'NOTE', (), 'Merged from a second card; see history'))
+            contact = Contact(contact.props + added, contact.raw, added)
+        contacts.append(contact)
+    return contacts
+
+
+def vobject_save(contacts, filename):
+    """The original writer: one vobject serialize() and write per card."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for contact in contacts:
+            f.write(contact.to_vcard().serialize())
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--merged', type=float, default=0.0, help='Fraction of cards with appended properties')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.cards, args.merged)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'input.vcf')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.writelines(c.raw for c in contacts)
+        out = os.path.join(tmp, 'out.vcf')
+        copy = best_time(lambda: shutil.copyfile(source, out), args.repeat)
+        direct = best_time(lambda: save_vcards(contacts, out), args.repeat)
+        old = best_time(lambda: vobject_save(contacts, out), 1)
+    print(f"{'writer':>18} {'seconds':>9} {'cards/sec':>12} {'vs copy':>8}")
+    for name, seconds in (('file copy', copy), ('save_vcards', direct), ('vobject serialize', old)):
+        print(f"{name:>18} {seconds:>9.3f} {args.cards / seconds:>12,.0f} {seconds / copy:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: sharded output (--shards).
+
+Groups a synthetic corpus once, then times merging and writing it as one
+file (merge_contacts + save_vcards) and as N shards with write_shards(),
+whose shard writers run concurrently, next to the same shards written one
+after the other. Shard sizes show how evenly the key hash spreads groups.
+
+    python benchmarks/bench_shards.py --cards 100000 --shards 1,4,16
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from make_corpus import write_corpus  # noqa: E402
+from merge_vcards import (_write_shard, build_parser, find_duplicates, iter_vcards, merge_contacts,  # noqa: E402
+                          partition_groups, save_vcards, shard_paths, write_shards)
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--shards', default='1,4,16', help='Comma-separated shard counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'corpus.vcf')
+        write_corpus(corpus, args.cards)
+        groups = find_duplicates(list(iter_vcards(corpus, Counter())), ['FN'])
+        output = os.path.join(tmp, 'merged.vcf')
+        single, _ = best_time(lambda: save_vcards(merge_contacts(groups)[0], output), args.repeat)
+        rows = []
+        for count in (int(s) for s in args.shards.split(',') if s.strip()):
+            merge_args = build_parser().parse_args(['--shards', str(count)])
+            concurrent, manifest = best_time(lambda: write_shards(groups, output, merge_args), args.repeat)
+            paths = shard_paths(output, count)[0]
+            sequential, _ = best_time(lambda: [_write_shard(i, part, path, merge_args) for i, (part, path)
+                                               in enumerate(zip(partition_groups(groups, count), paths))],
+                                      args.repeat)
+            sizes = [f['contacts'] for f in manifest['files']]
+            rows.append((count, concurrent, sequential, min(sizes), max(sizes)))
+
+    print(f"{'shards':>6} {'concurrent s':>13} {'sequential s':>13} {'smallest':>9} {'largest':>9}")
+    print(f"{'file':>6} {single:>13.3f} {'':>13} {'':>9} {'':>9}")
+    for count, concurrent, sequential, smallest, largest in rows:
+        print(f"{count:>6} {concurrent:>13.3f} {sequential:>13.3f} {smallest:>9,} {largest:>9,}")
+    print(f"{args.cards} cards, {len(groups)} groups; {os.cpu_count()} CPUs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: cold start of merge_vcards for headless runs.
+
+Times fresh interpreter processes that import merge_vcards, and that run
+the CLI with --no-gui on a 10-card corpus. Each is timed with tkinter,
+vobject and concurrent.futures imported up front, as the module used to do
+at import time, and as it loads now. The bare interpreter start is the floor.
+
+    python benchmarks/bench_startup.py --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, '..', 'merge_vcards.py')
+sys.path.insert(0, HERE)
+
+from make_corpus import write_corpus  # noqa: E402
+
+EAGER = 'import tkinter, tkinter.filedialog, vobject, concurrent.futures; '
+IMPORT = f'import sys; sys.path.insert(0, {os.path.dirname(SCRIPT)!r}); import merge_vcards'
+RUN_CLI = f'import runpy, sys; sys.argv = [{SCRIPT!r}] + sys.argv[1:]; runpy.run_path({SCRIPT!r}, run_name="__main__")'
+
+
+def median_time(code, argv, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code, *argv], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'tiny.vcf')
+        write_corpus(corpus, 10, mix='minimal')
+        cli_args = ['-i', corpus, '-o', os.path.join(tmp, 'out.vcf'), '--no-gui']
+        floor = median_time('pass', [], args.repeat)
+        rows = [
+            ('import merge_vcards', median_time(EAGER + IMPORT, [], args.repeat),
+             median_time(IMPORT, [], args.repeat)),
+            ('CLI --no-gui, 10 cards', median_time(EAGER + RUN_CLI, cli_args, args.repeat),
+             median_time(RUN_CLI, cli_args, args.repeat)),
+        ]
+    print(f"{'process':>24} {'eager ms':>9} {'lazy ms':>8} {'saved ms':>9}")
+    print(f"{'python -c pass':>24} {floor * 1000:>9.1f} {floor * 1000:>8.1f} {'':>9}")
+    for name, eager, lazy in rows:
+        print(f"{name:>24} {eager * 1000:>9.1f} {lazy * 1000:>8.1f} {(eager - lazy) * 1000:>9.1f}")
+    print(f"(median of {args.repeat} fresh processes)")
+
+
+if __name__ == '__main__':
+    main()
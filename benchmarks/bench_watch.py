@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: applying a burst of dropped files in --watch mode.
+
+A folder holds one large export; then --drops small files (a few cards each,
+half of them duplicates of existing people) arrive at once. Times applying
+them as one watch batch (parse only the new files, add their cards to the
+held groups, merge and render only the groups they touched) against one
+batch per file, and against a full run over all files, which is what a
+cron job re-running merge_vcards would pay.
+
+    python benchmarks/bench_watch.py --cards 100000 --drops 100
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from make_corpus import write_corpus  # noqa: E402
+from merge_vcards import FolderMerge, build_parser, scan_folder  # noqa: E402
+
+
+def write_drops(folder, corpus, drops, per_drop):
+    """drops files of per_drop cards: copies of corpus cards with a new note, and new people."""
+    with open(corpus, encoding='utf-8', newline='') as f:
+        cards = re.findall(r'BEGIN:VCARD.*?END:VCARD\r\n', f.read(), re.S)
+    rnd = random.Random(1)
+    for i in range(drops):
+        texts = []
+        for j in range(per_drop):
+            if j % 2 == 0:
+                texts.append(rnd.choice(cards).replace('END:VCARD', f'NOTE:Dropped in batch {i}\r\nEND:VCARD'))
+            else:
+                texts.append(f'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:Dropped Person {i}-{j}\r\n'
+                             f'EMAIL:dropped.{i}.{j}@example.org\r\nEND:VCARD\r\n')
+        with open(os.path.join(folder, f'drop{i:04d}.vcf'), 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(texts))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--drops', type=int, default=100)
+    parser.add_argument('--per-drop', type=int, default=10, help='Cards per dropped file')
+    args = parser.parse_args()
+
+    merge_args = build_parser().parse_args([])
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, 'drop')
+        os.makedirs(folder)
+        base = os.path.join(folder, 'base.vcf')
+        write_corpus(base, args.cards)
+        output = os.path.join(tmp, 'merged.vcf')
+        start_files = scan_folder(folder, '.vcf')
+        write_drops(folder, base, args.drops, args.per_drop)
+        all_files = scan_folder(folder, '.vcf')
+        drops = {path: sig for path, sig in all_files.items() if path not in start_files}
+
+        def warm():
+            folder_merge = FolderMerge(merge_args)
+            folder_merge.update(start_files, [])
+            folder_merge.write(output)
+            return folder_merge
+
+        def full():
+            folder_merge = FolderMerge(merge_args)
+            folder_merge.update(all_files, [])
+            folder_merge.write(output)
+
+        held = warm()
+        one_batch = timed(lambda: (held.update(drops, []), held.write(output)))
+        held = warm()
+
+        def per_file():
+            for path, sig in drops.items():
+                held.update({path: sig}, [])
+                held.write(output)
+        batch_per_file = timed(per_file)
+        full_run = timed(full)
+
+    print(f"{'apply ' + str(args.drops) + ' drops':>28} {'seconds':>9}")
+    print(f"{'one watch batch':>28} {one_batch:>9.3f}")
+    print(f"{'one batch per file':>28} {batch_per_file:>9.3f}")
+    print(f"{'full run over all files':>28} {full_run:>9.3f}")
+    print(f"{args.cards} cards in the folder, {args.drops} drops of {args.per_drop} cards")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Generate a deterministic synthetic vCard corpus for benchmarking.
+
+The same options and --seed always produce the same file. Cards of one
+person share the FN, N and first email address (so they group under
+the default FN key and pass --safe-merge), and differ in the rest of their
+properties. Card order is shuffled so duplicates are spread over the file.
+
+    python benchmarks/make_corpus.py --cards 100000 -o corpus.vcf
+    python benchmarks/make_corpus.py --cards 10000 --dup-ratio 0.5 --group-sizes zipf:1.5 \\
+        --mix rich --photo-ratio 0.1 --photo-bytes 8192 -o rich.vcf
+"""
+
+import argparse
+import base64
+import random
+
+FIRST_NAMES = ('Ann', 'Ben', 'Carla', 'David', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas',
+               'Kofi', 'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sven', 'Tara')
+LAST_NAMES = ('Adams', 'Brown', 'Chen', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ivanov',
+              'Jensen', 'Kim', 'Lopez', 'Müller', 'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Silva')
+COMPANIES = tuple(f'Company {i}' for i in range(200))
+TITLES = ('Engineer', 'Manager', 'Director', 'Analyst', 'Designer', 'Consultant', 'Sales Lead')
+CATEGORIES = ('Work', 'Family', 'Friends', 'VIP', 'Imported')
+
+# Chance of each optional property per card; EMAIL/TEL give the maximum count
+MIXES = {
+    'minimal': {'EMAIL': 1, 'TEL': 1},
+    'typical': {'EMAIL': 3, 'TEL': 3, 'ORG': 0.7, 'TITLE': 0.5, 'ADR': 0.4, 'NOTE': 0.3},
+    'rich': {'EMAIL': 4, 'TEL': 4, 'ORG': 0.9, 'TITLE': 0.8, 'ADR': 0.8, 'NOTE': 0.6, 'URL': 0.5,
+             'BDAY': 0.4, 'CATEGORIES': 0.3},
+}
+
+DEFAULTS = {
+    'dup_ratio': 0.3,
+    'group_sizes': 'zipf:2.0',
+    'mix': 'typical',
+    'photo_ratio': 0.0,
+    'photo_bytes': 4096,
+    'seed': 1,
+}
+
+
+def parse_group_sizes(spec: str):
+    """Return a function drawing a duplicate group size (>= 2) from a random.Random.
+
+    fixed:N        every duplicate group has N cards
+    uniform:A-B    sizes uniformly between A and B
+    zipf:S         P(size = k) proportional to 1 / (k-1)**S, capped at 1000
+    """
+    kind, _, arg = spec.partition(':')
+    try:
+        if kind == 'fixed':
+            size = int(arg)
+            if size >= 2:
+                return lambda rnd: size
+        elif kind == 'uniform':
+            low, high = (int(x) for x in arg.split('-'))
+            if 2 <= low <= high:
+                return lambda rnd: rnd.randint(low, high)
+        elif kind == 'zipf':
+            s = float(arg)
+            if s > 0:
+                sizes = range(2, 1001)
+                weights = [1 / (k - 1) ** s for k in sizes]
+                total = sum(weights)
+                cumulative = []
+                acc = 0.0
+                for w in weights:
+                    acc += w / total
+                    cumulative.append(acc)
+                return lambda rnd: rnd.choices(sizes, cum_weights=cumulative)[0]
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid group size distribution '{spec}' (use fixed:N, uniform:A-B or zipf:S)")
+
+
+def plan_people(cards: int, dup_ratio: float, draw_size, rnd: random.Random) -> list:
+    """Cards per person, summing to cards, with about dup_ratio of them duplicates."""
+    duplicates = round(cards * dup_ratio)
+    sizes = []
+    while duplicates > 0:
+        size = min(draw_size(rnd), duplicates + 1)
+        sizes.append(size)
+        duplicates -= size - 1
+    singles = cards - sum(sizes)
+    if singles < 0:
+        raise ValueError(f"Duplicate ratio {dup_ratio} leaves no room for {cards} cards")
+    return sizes + [1] * singles
+
+
+def _photo_lines(rnd: random.Random, size: int) -> list:
+    data = base64.b64encode(rnd.randbytes(size)).decode('ascii')
+    first, rest = data[:44], data[44:]
+    return ['PHOTO;ENCODING=b;TYPE=JPEG:' + first] + [' ' + rest[i:i + 74] for i in range(0, len(rest), 74)]
+
+
+def card_text(person: int, variant: int, seed: int, mix: dict, photo_ratio: float, photo_bytes: int) -> str:
+    """Text of one card; everything a person's cards share comes from the person's own RNG."""
+    shared = random.Random(f'{seed}:{person}')
+    first, last = shared.choice(FIRST_NAMES), shared.choice(LAST_NAMES)
+    # The person number keeps names unique, so FN grouping matches the plan exactly
+    fn = f'{first} {last} {person}'
+    emails = [f'{first.lower()}.{person}.{i}@example.com' for i in range(max(1, mix.get('EMAIL', 0)))]
+    tels = [f'+1 555 {shared.randrange(10**7):07d}' for _ in range(max(1, mix.get('TEL', 0)))]
+    rnd = random.Random(f'{seed}:{person}:{variant}')
+    lines = ['BEGIN:VCARD', 'VERSION:3.0', f'FN:{fn}', f'N:{last} {person};{first};;;']
+    # Every card keeps the first email so duplicates share evidence
+    lines.append(f'EMAIL;TYPE=INTERNET:{emails[0]}')
+    for email in emails[1:]:
+        if rnd.random() < 0.5:
+            lines.append(f'EMAIL;TYPE=INTERNET:{email}')
+    for tel in tels:
+        if rnd.random() < 0.5:
+            lines.append(f'TEL;TYPE={rnd.choice(("CELL", "HOME", "WORK"))}:{tel}')
+    if rnd.random() < mix.get('ORG', 0):
+        lines.append(f'ORG:{shared.choice(COMPANIES)};{rnd.choice(("Sales", "R&D", "Support"))}')
+    if rnd.random() < mix.get('TITLE', 0):
+        lines.append(f'TITLE:{rnd.choice(TITLES)}')
+    if rnd.random() < mix.get('ADR', 0):
+        lines.append(f'ADR;TYPE=HOME:;;{shared.randrange(1, 999)} Main St;Springfield;IL;'
+                     f'{shared.randrange(10**5):05d};USA')
+    if rnd.random() < mix.get('NOTE', 0):
+        lines.append(f'NOTE:Imported from device {variant}\\, batch {rnd.randrange(100)}')
+    if rnd.random() < mix.get('URL', 0):
+        lines.append(f'URL:https://example.com/{first.lower()}{person}')
+    if rnd.random() < mix.get('BDAY', 0):
+        lines.append(f'BDAY:{shared.randrange(1940, 2005)}-{shared.randrange(1, 13):02d}-'
+                     f'{shared.randrange(1, 29):02d}')
+    if rnd.random() < mix.get('CATEGORIES', 0):
+        lines.append('CATEGORIES:' + ','.join(rnd.sample(CATEGORIES, 2)))
+    if photo_ratio and rnd.random() < photo_ratio:
+        lines += _photo_lines(rnd, photo_bytes)
+    lines.append('END:VCARD')
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def write_corpus(filename: str, cards: int, dup_ratio: float = DEFAULTS['dup_ratio'],
+                 group_sizes: str = DEFAULTS['group_sizes'], mix: str = DEFAULTS['mix'],
+                 photo_ratio: float = DEFAULTS['photo_ratio'], photo_bytes: int = DEFAULTS['photo_bytes'],
+                 seed: int = DEFAULTS['seed']) -> dict:
+    """Write the corpus to filename and return a summary of what was generated."""
+    if not 0 <= dup_ratio < 1:
+        raise ValueError("Duplicate ratio must be in [0, 1)")
+    if mix not in MIXES:
+        raise ValueError(f"Unknown property mix '{mix}' (choose from {', '.join(MIXES)})")
+    rnd = random.Random(seed)
+    sizes = plan_people(cards, dup_ratio, parse_group_sizes(group_sizes), rnd)
+    # One entry per card: (person, variant), shuffled so groups are spread out
+    order = [(person, variant) for person, size in enumerate(sizes) for variant in range(size)]
+    rnd.shuffle(order)
+    props = MIXES[mix]
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        buf = []
+        for person, variant in order:
+            buf.append(card_text(person, variant, seed, props, photo_ratio, photo_bytes))
+            if len(buf) >= 10000:
+                f.write(''.join(buf))
+                buf.clear()
+        f.write(''.join(buf))
+    return {
+        'cards': cards,
+        'people': len(sizes),
+        'duplicate_groups': sum(1 for s in sizes if s > 1),
+        'largest_group': max(sizes, default=0),
+        'dup_ratio': dup_ratio,
+        'group_sizes': group_sizes,
+        'mix': mix,
+        'photo_ratio': photo_ratio,
+        'photo_bytes': photo_bytes,
+        'seed': seed,
+    }
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--dup-ratio', type=float, default=DEFAULTS['dup_ratio'],
+                        help='Fraction of cards that duplicate another card (default: %(default)s)')
+    parser.add_argument('--group-sizes', default=DEFAULTS['group_sizes'],
+                        help='Duplicate group size distribution: fixed:N, uniform:A-B or zipf:S (default: %(default)s)')
+    parser.add_argument('--mix', choices=sorted(MIXES), default=DEFAULTS['mix'],
+                        help='Property mix per card (default: %(default)s)')
+    parser.add_argument('--photo-ratio', type=float, default=DEFAULTS['photo_ratio'],
+                        help='Fraction of cards carrying a base64 PHOTO (default: %(default)s)')
+    parser.add_argument('--photo-bytes', type=int, default=DEFAULTS['photo_bytes'],
+                        help='Decoded size of each PHOTO blob in bytes (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+
+
+def corpus_options(args) -> dict:
+    return {'dup_ratio': args.dup_ratio, 'group_sizes': args.group_sizes, 'mix': args.mix,
+            'photo_ratio': args.photo_ratio, 'photo_bytes': args.photo_bytes, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('-o', '--output', required=True)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    try:
+        summary = write_corpus(args.output, args.cards, **corpus_options(args))
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Wrote {summary['cards']} cards for {summary['people']} people "
+          f"({summary['duplicate_groups']} duplicate groups, largest {summary['largest_group']}) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
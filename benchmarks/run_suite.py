@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: time every merge_vcards stage on synthetic corpora.
+
+For each corpus size a deterministic corpus is generated with make_corpus.py
+(or reused from --corpus-dir), then load_vcards, find_duplicates,
+merge_contacts, save_vcards and save_csv are timed one after the other in a
+fresh process. Throughput and the peak RSS during each stage are written to
+a JSON results file, so two runs can be diffed to spot regressions. Where
+the peak cannot be reset between stages (anything but Linux), it is the
+process's peak so far and the run is marked with peak_rss_scope 'process'.
+
+    python benchmarks/run_suite.py --sizes 10k,100k -o results.json
+    python benchmarks/run_suite.py --sizes 1m --corpus-dir /tmp/corpora --mix rich --photo-ratio 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from make_corpus import add_corpus_arguments, corpus_options, write_corpus  # noqa: E402
+
+RESULTS_VERSION = 2
+CSV_FIELDS = ['FN', 'EMAIL', 'TEL', 'ORG', 'TITLE']
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def reset_peak_rss() -> bool:
+    """Restart the process's peak RSS from its current RSS; False where the kernel cannot (non-Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS since the last reset_peak_rss() (Linux VmHWM), else since the process started."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            return round(int(re.search(r'VmHWM:\s+(\d+)', f.read()).group(1)) / 1024, 1)
+    except (OSError, AttributeError):
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def corpus_path(corpus_dir: str, cards: int, options: dict) -> str:
+    tag = '_'.join(f'{v}' for v in options.values()).replace(':', '-')
+    return os.path.join(corpus_dir, f'corpus_{cards}_{tag}.vcf')
+
+
+def load_corpus(corpus: str):
+    """Summary of a corpus generated by an earlier run, or None if it is missing."""
+    try:
+        with open(corpus + '.json', encoding='utf-8') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return summary if os.path.exists(corpus) else None
+
+
+def generate_corpus(parser, corpus: str, cards: int, options: dict) -> dict:
+    try:
+        summary = write_corpus(corpus + '.tmp', cards, **options)
+    except ValueError as e:
+        parser.error(str(e))
+    os.replace(corpus + '.tmp', corpus)
+    with open(corpus + '.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f)
+    return summary
+
+
+def run_stages(corpus: str, work_dir: str, key_fields: list) -> dict:
+    """Run the pipeline once on corpus; executed in a fresh process per corpus."""
+    from merge_vcards import find_duplicates, load_vcards, merge_contacts, save_csv, save_vcards
+
+    results = {}
+    scope = ['stage']
+
+    def stage(name, fn, items=None):
+        """Time fn(); items is the number of cards processed (default: cards it returned)."""
+        if not reset_peak_rss():
+            scope[0] = 'process'
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        seconds = time.perf_counter() - start
+        if items is None:
+            items = len(value[0])
+        results[name] = {'seconds': round(seconds, 4), 'items': items,
+                         'items_per_sec': round(items / seconds) if seconds else None,
+                         'peak_rss_mb': peak_rss_mb()}
+        return value
+
+    vcards, _ = stage('load_vcards', lambda: load_vcards(corpus))
+    groups = stage('find_duplicates', lambda: find_duplicates(vcards, key_fields), len(vcards))
+    merged, _ = stage('merge_contacts', lambda: merge_contacts(groups), len(vcards))
+    out_vcf = os.path.join(work_dir, 'out.vcf')
+    out_csv = os.path.join(work_dir, 'out.csv')
+    stage('save_vcards', lambda: save_vcards(merged, out_vcf), len(merged))
+    stage('save_csv', lambda: save_csv(merged, out_csv, CSV_FIELDS), len(merged))
+    return {'input_cards': len(vcards), 'output_cards': len(merged), 'groups': len(groups),
+            'output_bytes': os.path.getsize(out_vcf), 'peak_rss_scope': scope[0], 'stages': results}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        import vobject
+        vobject_version = getattr(vobject, 'VERSION', None) or getattr(vobject, '__version__', None)
+    except ImportError:
+        vobject_version = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'vobject': vobject_version, 'commit': commit}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10k,100k',
+                        help='Comma-separated corpus sizes, e.g. 10k,100k,1m (default: %(default)s)')
+    parser.add_argument('--corpus-dir', help='Keep generated corpora here and reuse them on later runs')
+    parser.add_argument('--dedupe-key', default='FN', help='Key fields passed to find_duplicates (default: FN)')
+    parser.add_argument('-o', '--output', default='bench_results.json', help='JSON results file (default: %(default)s)')
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    try:
+        sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    except ValueError:
+        parser.error(f"Invalid --sizes '{args.sizes}'")
+    options = corpus_options(args)
+    key_fields = [f.strip() for f in args.dedupe_key.split(',') if f.strip()]
+
+    report = {'version': RESULTS_VERSION, 'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+              'environment': environment(), 'corpus_options': options, 'dedupe_key': key_fields, 'runs': []}
+    # Each corpus runs in its own process so peak RSS is not inherited from the previous one
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus_dir or tmp
+        os.makedirs(corpus_dir, exist_ok=True)
+        print(f"{'cards':>9} {'stage':>16} {'seconds':>9} {'items/sec':>11} {'peak RSS MB':>12}")
+        for cards in sizes:
+            corpus = corpus_path(corpus_dir, cards, options)
+            summary = load_corpus(corpus) or generate_corpus(parser, corpus, cards, options)
+            with ctx.Pool(1) as pool:
+                run = pool.apply(run_stages, (corpus, tmp, key_fields))
+            run.update({'cards': cards, 'corpus_bytes': os.path.getsize(corpus), 'corpus_summary': summary})
+            report['runs'].append(run)
+            for name, stage in run['stages'].items():
+                print(f"{cards:>9} {name:>16} {stage['seconds']:>9.3f} {stage['items_per_sec'] or 0:>11,} "
+                      f"{stage['peak_rss_mb']:>12.1f}")
+            if run['peak_rss_scope'] == 'process':
+                print(f"{'':>9} (peak RSS could not be reset per stage: each figure is the peak so far)")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
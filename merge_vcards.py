@@ -1,15 +1,39 @@
-import vobject
-from collections import defaultdict, Counter
-import tkinter as tk
-from tkinter import filedialog
+from collections import defaultdict, Counter, deque
 import os
 import argparse
+import base64
 from typing import List, Dict
 import csv
 import sys
+import codecs
+import contextlib
+import cProfile
+import io
+import itertools
+import difflib
+import functools
+import hashlib
+import heapq
+import json
+import mmap
+import pickle
+import random
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+import zlib
+
+# GUI, vobject and process-pool modules are imported where they are used, so
+# headless runs and library callers don't pay for them at import time.
 
 # Prompt user to select a file
 def select_vcard_file():
+    import tkinter as tk
+    from tkinter import filedialog
     root = tk.Tk()
     root.withdraw()
     file_path = filedialog.askopenfilename(
@@ -20,12 +44,18 @@ def select_vcard_file():
 
 # Prompt user to select output file name and location
 def select_output_file(default_name="merged_contacts.vcf", fmt: str = 'vcf'):
+    import tkinter as tk
+    from tkinter import filedialog
     root = tk.Tk()
     root.withdraw()
     if fmt.lower() == 'csv':
         filetypes = [("CSV files", "*.csv"), ("All files", "*.*")]
         def_ext = ".csv"
         title = "Save merged contacts as CSV..."
+    elif fmt.lower() == 'jsonl':
+        filetypes = [("JSON Lines files", "*.jsonl"), ("All files", "*.*")]
+        def_ext = ".jsonl"
+        title = "Save merged contacts as JSON Lines..."
     else:
         filetypes = [("vCard files", "*.vcf"), ("All files", "*.*")]
         def_ext = ".vcf"
@@ -38,87 +68,1401 @@ def select_output_file(default_name="merged_contacts.vcf", fmt: str = 'vcf'):
     )
     return file_path
 
+_UNCLOSED_CARD = "Parse error: VCARD component wasn't closed at end of file. It will be skipped."
+# UTF-8 byte order mark as decoded text; some exporters start files with it
+_BOM = '\ufeff'
+
+def _split_card_texts(lines, stats: Dict[str, int], report=print):
+    """Yield the raw text of each top-level BEGIN:VCARD ... END:VCARD block.
+
+    lines: any iterable of text lines (an open file is read lazily, so only one
+    card's worth of text is held at a time). Nested cards (vCard 2.1 AGENT) stay
+    inside their parent. Text outside a card is ignored; a card still open at
+    end of input counts as malformed, like vobject's "never closed" error. A
+    byte order mark at the start of a line (of the file, or of a file
+    concatenated to it) is dropped.
+    report: callable receiving parse error messages (default: print).
+    """
+    buf: List[str] = []
+    depth = 0
+    for line in lines:
+        if line.startswith(_BOM):
+            line = line[1:]
+        # Folded continuation lines start with whitespace and never delimit a card
+        if line[:1] in (' ', '\t'):
+            if depth:
+                buf.append(line)
+            continue
+        marker = line.rstrip().upper()
+        if marker == 'BEGIN:VCARD':
+            depth += 1
+        elif depth == 0:
+            continue
+        buf.append(line)
+        if marker == 'END:VCARD':
+            depth -= 1
+            if depth == 0:
+                yield ''.join(buf)
+                buf = []
+    if depth:
+        report(_UNCLOSED_CARD)
+        stats['malformed'] += 1
+
+# --- Native tokenizer -------------------------------------------------------
+# Decodes plain cards exactly the way vobject's vCard 3.0 behaviors would, but
+# without its regex line parser and per-attribute bookkeeping. Anything it is
+# not sure about (quoted parameters, BASE64/other encodings, nested cards,
+# CATEGORIES, unusual charsets) makes tokenize_vcard() return None and the
+# card is handed to vobject instead.
+
+_NAME_RE = re.compile(r'[A-Za-z0-9_-]+')
+# Values vobject leaves undecoded (no behavior / no-op behavior)
+_RAW_VALUE_PROPS = frozenset(('VERSION', 'GEO'))
+# Structured values split on ';' (and ',' within a field) into native objects
+_STRUCTURED_PROPS = frozenset(('N', 'ADR', 'ORG'))
+# Properties with special vobject handling that the tokenizer does not mirror
+_VOBJECT_ONLY_PROPS = frozenset(('BEGIN', 'END', 'PROFILE', 'CATEGORIES'))
+
+def _split_text_list(value: str, sep: str) -> List[str]:
+    # Mirrors stringToTextValues for unescaped input: a trailing empty item is dropped
+    parts = value.split(sep)
+    if len(parts) > 1 and not parts[-1]:
+        parts.pop()
+    return parts
+
+def _decode_structured(value: str):
+    """Split an N/ADR/ORG value into fields; multi-valued fields become lists."""
+    if '\\' in value:
+        from vobject.vcard import splitFields
+        return splitFields(value)
+    fields = []
+    for field in _split_text_list(value, ';'):
+        items = _split_text_list(field, ',')
+        fields.append(items[0] if len(items) == 1 else items)
+    return fields
+
+def _decode_text(value: str) -> str:
+    """Unescape a text value; like vobject, only the first comma-separated item is kept."""
+    if '\\' in value:
+        from vobject.icalendar import stringToTextValues
+        return stringToTextValues(value)[0]
+    return value.split(',', 1)[0]
+
+def _tokenize_line(line: str):
+    """Split one unfolded content line into (group, name, params, value), or None."""
+    colon = line.find(':')
+    if colon <= 0:
+        return None
+    head = line[:colon]
+    if '"' in head:
+        return None
+    value = line[colon + 1:]
+    name_part, *param_parts = head.split(';')
+    group, _, name = name_part.rpartition('.')
+    if not _NAME_RE.fullmatch(name) or (group and not _NAME_RE.fullmatch(group)):
+        return None
+    name = name.replace('_', '-').upper()
+    params = []
+    singletons = []
+    qp = False
+    for part in param_parts:
+        key, eq, raw_vals = part.partition('=')
+        if not _NAME_RE.fullmatch(key):
+            return None
+        vals = [v for v in raw_vals.split(',') if v] if eq else []
+        if not vals:
+            if key == 'QUOTED-PRINTABLE':
+                qp = True
+            else:
+                singletons.append(key)
+            continue
+        key = key.upper()
+        if key == 'ENCODING':
+            if 'QUOTED-PRINTABLE' in vals:
+                qp = True
+                vals.remove('QUOTED-PRINTABLE')
+            if vals:
+                return None
+            continue
+        params.append((key, *vals))
+    if 'BASE64' in singletons:
+        return None
+    if qp:
+        charset = next((p[1] for p in params if p[0] == 'CHARSET'), 'utf-8')
+        try:
+            value = codecs.decode(value.encode('utf-8'), 'quoted-printable').decode(charset)
+        except (LookupError, ValueError):
+            return None
+    params.extend((key,) for key in singletons)
+    return group or None, name, tuple(params), value
+
+def tokenize_vcard(text: str):
+    """Tokenize one BEGIN:VCARD ... END:VCARD block without vobject.
+
+    Handles line unfolding, property groups, parameters, QUOTED-PRINTABLE and
+    backslash escaping. Returns a list of (group, name, params, value) tuples,
+    where params is a tuple of (key, *values) tuples and value is decoded (a
+    list of fields for N/ADR/ORG). Returns None when the card needs vobject.
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    logical: List[str] = []
+    prev = ''
+    for physical in text.split('\n'):
+        if physical[:1] in (' ', '\t'):
+            # vobject only unfolds directly after a content line
+            if not prev:
+                return None
+            logical[-1] += physical[1:]
+        elif physical:
+            logical.append(physical)
+        prev = physical
+    if (len(logical) < 2 or logical[0].upper() != 'BEGIN:VCARD'
+            or logical[-1].upper() != 'END:VCARD'):
+        return None
+    tokens = []
+    for line in logical[1:-1]:
+        tok = _tokenize_line(line)
+        if tok is None or tok[1] in _VOBJECT_ONLY_PROPS:
+            return None
+        group, name, params, value = tok
+        if name in _STRUCTURED_PROPS:
+            value = _decode_structured(value)
+        elif name not in _RAW_VALUE_PROPS:
+            value = _decode_text(value)
+        tokens.append((group, name, params, value))
+    return tokens
+
+def component_from_tokens(tokens):
+    """Build a vobject vCard from tokenize_vcard() output.
+
+    The result serializes exactly like vobject.readOne() of the same text.
+    """
+    from vobject.base import Component
+    from vobject.vcard import VCard3_0
+    card = Component('VCARD')
+    for group, name, params, value in tokens:
+        card.add(content_line(group, name, params, value))
+    card.setBehavior(VCard3_0)
+    return card
+
+def content_line(group, name, params, value):
+    """Build a vobject ContentLine from a decoded (group, name, params, value) property."""
+    from vobject.base import ContentLine
+    from vobject.vcard import Name, Address, NAME_ORDER, ADDRESS_ORDER
+    if name == 'N':
+        return ContentLine(name, params, Name(**dict(zip(NAME_ORDER, value))), group, isNative=True)
+    if name == 'ADR':
+        return ContentLine(name, params, Address(**dict(zip(ADDRESS_ORDER, value))), group, isNative=True)
+    if name == 'ORG':
+        return ContentLine(name, params, list(value), group, isNative=True)
+    return ContentLine(name, params, value, group)
+
+# --- Value normalization -------------------------------------------------------
+# EMAIL and TEL values are compared in a normalized form everywhere (dedupe keys,
+# --cluster, --safe-merge, the SQLite store, CSV export). The same numbers recur
+# across duplicate cards, so each distinct TEL value is normalized once and
+# remembered in a bounded LRU. Lowercasing an email is cheaper than the cache
+# lookup, so emails are not memoized.
+
+_NORMALIZE_CACHE_SIZE = 1 << 16
+
+# Default region -> (country calling code, international prefix, trunk prefix)
+PHONE_REGIONS = {
+    'AE': ('971', '00', '0'), 'AR': ('54', '00', '0'), 'AT': ('43', '00', '0'), 'AU': ('61', '0011', '0'),
+    'BE': ('32', '00', '0'), 'BR': ('55', '00', '0'), 'CA': ('1', '011', '1'), 'CH': ('41', '00', '0'),
+    'CL': ('56', '00', ''), 'CN': ('86', '00', '0'), 'CO': ('57', '00', ''), 'CZ': ('420', '00', ''),
+    'DE': ('49', '00', '0'), 'DK': ('45', '00', ''), 'EG': ('20', '00', '0'), 'ES': ('34', '00', ''),
+    'FI': ('358', '00', '0'), 'FR': ('33', '00', '0'), 'GB': ('44', '00', '0'), 'GR': ('30', '00', ''),
+    'HK': ('852', '001', ''), 'HU': ('36', '00', '06'), 'ID': ('62', '001', '0'), 'IE': ('353', '00', '0'),
+    'IL': ('972', '00', '0'), 'IN': ('91', '00', '0'), 'IT': ('39', '00', ''), 'JP': ('81', '010', '0'),
+    'KE': ('254', '000', '0'), 'KR': ('82', '001', '0'), 'MX': ('52', '00', ''), 'MY': ('60', '00', '0'),
+    'NG': ('234', '009', '0'), 'NL': ('31', '00', '0'), 'NO': ('47', '00', ''), 'NZ': ('64', '00', '0'),
+    'PE': ('51', '00', '0'), 'PH': ('63', '00', '0'), 'PK': ('92', '00', '0'), 'PL': ('48', '00', ''),
+    'PT': ('351', '00', ''), 'RO': ('40', '00', '0'), 'RU': ('7', '810', '8'), 'SA': ('966', '00', '0'),
+    'SE': ('46', '00', '0'), 'SG': ('65', '000', ''), 'TH': ('66', '001', '0'), 'TR': ('90', '00', '0'),
+    'TW': ('886', '002', '0'), 'UA': ('380', '00', '0'), 'US': ('1', '011', '1'), 'VN': ('84', '00', '0'),
+    'ZA': ('27', '00', '0'),
+}
+
+_phone_region = None
+
+def set_phone_region(region):
+    """Canonicalize TEL values to E.164 for this default region (None: digits only)."""
+    global _phone_region
+    if region is not None:
+        region = region.strip().upper()
+        if region not in PHONE_REGIONS:
+            raise ValueError(f"Unknown phone region '{region}' (choose from {', '.join(sorted(PHONE_REGIONS))})")
+    if region != _phone_region:
+        _phone_region = region
+        normalize_tel.cache_clear()
+
+def e164_digits(text: str, digits: str, region: str):
+    """E.164 number (without '+') of a TEL value for a default region, or None.
+
+    text is the stripped value and digits its digits. A leading '+' or the
+    region's international prefix marks a number that already starts with its
+    country code; otherwise the trunk prefix is dropped and the region's code
+    put in front. Results outside E.164's 8-15 digits (short codes,
+    extensions without a number) give None.
+    """
+    code, international, trunk = PHONE_REGIONS[region]
+    if text.startswith('tel:'):
+        text = text[4:].lstrip()
+    if text.startswith('+'):
+        number = digits
+    elif digits.startswith(international):
+        number = digits[len(international):]
+    else:
+        number = code + (digits[len(trunk):] if trunk and digits.startswith(trunk) else digits)
+    return number if 8 <= len(number) <= 15 else None
+
+def normalize_email(value: str) -> str:
+    return value.strip().lower()
+
+@functools.lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def normalize_tel(value: str) -> str:
+    """Comparison form of a TEL value: its digits, or the lowercased text if it has none.
+
+    With a phone region set (set_phone_region), numbers are E.164 digits
+    including the country code, so '+1 555 0100 123' and '(555) 0100-123'
+    match for US.
+    """
+    text = value.strip().lower()
+    digits = ''.join(filter(str.isdigit, text))
+    if digits and _phone_region:
+        return e164_digits(text, digits, _phone_region) or digits
+    return digits or text
+
+def normalization_stats() -> Dict[str, int]:
+    """TEL values normalized and repeats answered from the LRU in this process."""
+    info = normalize_tel.cache_info()
+    return {'tel_normalized': info.misses, 'tel_reused': info.hits}
+
+# --- Compact contact record ---------------------------------------------------
+
+# Shared param tuples: most cards repeat the same handful of TYPE= combinations
+_PARAMS_CACHE: Dict[tuple, tuple] = {}
+
+def _freeze(value):
+    """Make a decoded property value hashable (lists -> tuples, recursively)."""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+# Field counts of the N and ADR structured values (vobject NAME_ORDER/ADDRESS_ORDER)
+_STRUCTURED_WIDTH = {'N': 5, 'ADR': 7}
+
+def _property_from_line(line) -> tuple:
+    """Convert a vobject ContentLine to a (group, name, params, value) tuple."""
+    from vobject.vcard import Name, Address, NAME_ORDER, ADDRESS_ORDER
+    value = line.value
+    if isinstance(value, Name):
+        value = tuple(_freeze(getattr(value, f)) for f in NAME_ORDER)
+    elif isinstance(value, Address):
+        value = tuple(_freeze(getattr(value, f)) for f in ADDRESS_ORDER)
+    else:
+        value = _freeze(value)
+    params = tuple((key, *vals) for key, vals in line.params.items())
+    params += tuple((key,) for key in line.singletonparams)
+    return line.group, line.name, params, value
+
+def _canonical_value(value):
+    """vobject escapes CRLF, CR and LF alike as \\n; fold them together."""
+    if isinstance(value, str):
+        return value.replace('\r\n', '\n').replace('\r', '\n') if '\r' in value else value
+    if isinstance(value, tuple):
+        return tuple(_canonical_value(v) for v in value)
+    return value
+
+_PHOTO_FINGERPRINT = (None, 'PHOTO')
+
+def property_fingerprint(prop: tuple) -> tuple:
+    """Hashable identity of a property.
+
+    Two properties share a fingerprint exactly when vobject would serialize them
+    to the same line: params are merged per key and sorted, and singleton params
+    (which serialize() drops) are ignored.
+    """
+    group, name, params, value = prop
+    if name == 'PHOTO':
+        # vobject's PHOTO serializer returns None, so line-based dedupe always
+        # treated photos as equal: a merged card keeps a single photo
+        return _PHOTO_FINGERPRINT
+    if not params:
+        return group, name, (), _canonical_value(value)
+    merged = {}
+    for key, *vals in params:
+        if vals:
+            merged.setdefault(key, []).extend(vals)
+    return group, name, tuple(sorted((k, tuple(v)) for k, v in merged.items())), _canonical_value(value)
+
+def _identity_fields(props) -> tuple:
+    """(fn, emails, tels) of a card's properties, as stored on Contact."""
+    fn = None
+    emails = []
+    tels = []
+    for _group, name, _params, value in props:
+        if name == 'FN' and fn is None:
+            fn = value.strip() if isinstance(value, str) else ''
+        if not isinstance(value, str):
+            continue
+        if name == 'EMAIL':
+            emails.append(normalize_email(value))
+        elif name == 'TEL':
+            tels.append(normalize_tel(value))
+    return fn or '', tuple(emails), tuple(tels)
+
+class Contact:
+    """Compact record for one parsed card, used throughout the merge pipeline.
+
+    Holds the normalized fields the dedupe/merge stages look at, every property
+    as a (group, name, params, value) tuple and the raw card text. The vobject
+    tree is only built by to_vcard() on demand; save_vcards writes raw directly.
+
+    fn: stripped FN value.
+    emails: lowercased EMAIL values, in card order.
+    tels: TEL values reduced to digits (lowercased text if there are none).
+    added: properties appended by merge_contacts (also at the end of props);
+    they are not part of raw.
+    """
+    __slots__ = ('fn', 'emails', 'tels', 'props', 'raw', 'added')
+
+    def __init__(self, props, raw: str, added: tuple = ()):
+        self.props = props
+        self.raw = raw
+        self.added = added
+        self.fn, self.emails, self.tels = _identity_fields(props)
+
+    @classmethod
+    def from_tokens(cls, tokens, raw: str) -> 'Contact':
+        props = []
+        for group, name, params, value in tokens:
+            params = _PARAMS_CACHE.setdefault(params, params)
+            value = _freeze(value)
+            if name in _STRUCTURED_WIDTH:
+                # Same shape as a vobject Name/Address: missing fields are ''
+                width = _STRUCTURED_WIDTH[name]
+                value = value[:width] + ('',) * (width - len(value))
+            props.append((group, sys.intern(name), params, value))
+        return cls(tuple(props), raw)
+
+    @classmethod
+    def from_vcard(cls, card, raw: str = None) -> 'Contact':
+        """Wrap an already parsed vobject card (raw defaults to its serialization)."""
+        from vobject.base import Component
+        if raw is None:
+            raw = card.serialize()
+        props = []
+        for line in card.getChildren():
+            if isinstance(line, Component):
+                # A nested card (vCard 2.1 AGENT) has no value; it stays in raw and is written with it
+                continue
+            group, name, params, value = _property_from_line(line)
+            params = _PARAMS_CACHE.setdefault(params, params)
+            props.append((group, sys.intern(name), params, value))
+        return cls(tuple(props), raw)
+
+    def to_vcard(self):
+        """Return a vobject card: a fresh parse of raw plus any merged-in properties."""
+        tokens = tokenize_vcard(self.raw)
+        if tokens is not None:
+            card = component_from_tokens(tokens)
+        else:
+            import vobject
+            card = vobject.readOne(self.raw)
+        for prop in self.added:
+            card.add(content_line(*prop))
+        return card
+
+    def __repr__(self):
+        return f"<Contact {self.fn!r}>"
+
+# Cards made only of unfolded content lines that tokenize_vcard() always accepts:
+# no quoted or encoded parameters, no nested cards, no CATEGORIES/PROFILE
+_PLAIN_LINE = r'(?:[A-Za-z0-9_-]+\.)?[A-Za-z0-9_-]+(?:;[A-Za-z0-9_-]+(?:=[^;:"\n]*)?)*:[^\n]*'
+_PLAIN_CARD_RE = re.compile(
+    r'(?i:BEGIN:VCARD)\n'
+    r'(?:(?:(?!(?:[A-Za-z0-9_-]+\.)?(?i:BEGIN|END|PROFILE|CATEGORIES)[;:])' + _PLAIN_LINE + r')?\n)*'
+    r'(?i:END:VCARD)\n?')
+_ENCODED_PARAM_RE = re.compile(r'(?i);(?:ENCODING|QUOTED-PRINTABLE|BASE64)(?=[;:=])')
+_IDENTITY_LINE_RE = re.compile(r'^(?:[A-Za-z0-9_-]+\.)?(FN|EMAIL|TEL)(?:;[^:\n]*)?:(.*)$', re.IGNORECASE | re.MULTILINE)
+
+def is_plain_card(text: str) -> bool:
+    """True if tokenize_vcard() is certain to accept text (LF line endings)."""
+    return _PLAIN_CARD_RE.fullmatch(text) is not None and _ENCODED_PARAM_RE.search(text) is None
+
+class LazyContact:
+    """A Contact for a plain card whose properties are tokenized on first access.
+
+    fn, emails and tels come from the card's FN/EMAIL/TEL lines alone, so
+    grouping and merging decisions on them never tokenize the card, and a
+    card that is written unchanged is never tokenized at all. Only created for
+    is_plain_card() text, so the deferred tokenize cannot fail.
+    """
+    __slots__ = ('fn', 'emails', 'tels', 'raw', 'added', '_props')
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.added = ()
+        self._props = None
+        self.fn, self.emails, self.tels = _identity_fields(
+            (None, m.group(1).upper(), (), _decode_text(m.group(2))) for m in _IDENTITY_LINE_RE.finditer(raw))
+
+    @classmethod
+    def from_fields(cls, raw: str, fn: str, emails: tuple, tels: tuple) -> 'LazyContact':
+        """Rebuild a LazyContact from its saved text and identity fields without scanning the text."""
+        contact = cls.__new__(cls)
+        contact.raw = raw
+        contact.added = ()
+        contact._props = None
+        contact.fn, contact.emails, contact.tels = fn, emails, tels
+        return contact
+
+    @property
+    def props(self) -> tuple:
+        if self._props is None:
+            self._props = Contact.from_tokens(tokenize_vcard(self.raw), self.raw).props
+        return self._props
+
+    to_vcard = Contact.to_vcard
+    __repr__ = Contact.__repr__
+
+def _parse_card_texts(texts, stats: Dict[str, int], report=print):
+    """Parse card texts into Contact records, yielding only cards with a non-empty FN.
+
+    Cards go through the native tokenizer when possible and through vobject
+    otherwise; stats counts 'parsed_native' and 'parsed_vobject' cards.
+    """
+    for text in texts:
+        try:
+            tokens = tokenize_vcard(text)
+            if tokens is not None:
+                contact = Contact.from_tokens(tokens, text)
+                stats['parsed_native'] += 1
+            else:
+                import vobject
+                contact = Contact.from_vcard(vobject.readOne(text), text)
+                stats['parsed_vobject'] += 1
+        except Exception as e:
+            report(f"Parse error: {e}. This vCard is malformed and will be skipped.")
+            stats['malformed'] += 1
+            continue
+        if contact.fn:
+            stats['loaded'] += 1
+            yield contact
+        else:
+            stats['malformed'] += 1
+
+def iter_vcards(filename, stats: Dict[str, int] = None, jobs: int = 1, report=print, input_format: str = 'vcf'):
+    """Stream valid cards from a file as Contact records, skipping malformed cards.
+
+    The file is read incrementally and each card is parsed on its own, so peak
+    memory is one card rather than the whole file. stats (e.g. a Counter) is
+    updated as the generator is consumed: 'loaded' for yielded cards and
+    'malformed' for unparseable or nameless ones.
+    jobs: parse with this many worker processes (see iter_vcards_parallel);
+    0 means one per CPU.
+    report: callable receiving parse error messages (default: print).
+    input_format: 'vcf', or 'jsonl' for save_jsonl() output (see iter_jsonl_cards).
+    """
+    if stats is None:
+        stats = Counter()
+    if input_format == 'jsonl':
+        yield from iter_jsonl_cards(filename, stats, report)
+        return
+    if jobs != 1:
+        yield from iter_vcards_parallel(filename, stats, jobs, report)
+        return
+    yield from iter_vcards_mapped(filename, stats, report)
+
+# Lines that open or close a vCard; folded lines start with whitespace and never match.
+# A byte order mark before the marker is skipped as _split_card_texts drops it: cards
+# start at group 1
+_CARD_MARKER_RE = re.compile(rb'^(?:' + re.escape(_BOM.encode('utf-8')) + rb')?(BEGIN|END):VCARD[ \t\r\f\v]*$',
+                             re.MULTILINE | re.IGNORECASE)
+
+def iter_card_offsets(filename):
+    """Yield the byte offset of every top-level BEGIN:VCARD line in the file.
+
+    The scan runs the marker regex over a memory map, so it is close to disk
+    speed and never decodes or parses the cards themselves. BEGIN/END lines are
+    depth-tracked the same way as _split_card_texts, so nested cards are never
+    reported as a boundary.
+    """
+    if os.path.getsize(filename) == 0:
+        return
+    depth = 0
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for m in _CARD_MARKER_RE.finditer(mm):
+            if m.group(1).upper() == b'BEGIN':
+                if depth == 0:
+                    yield m.start(1)
+                depth += 1
+            elif depth:
+                depth -= 1
+
+_LONE_CR_RE = re.compile(rb'\r(?!\n)')
+
+def iter_vcards_mapped(filename, stats: Dict[str, int], report=print):
+    """iter_vcards() over a memory map, deferring the parse of plain cards.
+
+    One marker scan over the map finds each top-level card's byte range
+    (depth-tracked like _split_card_texts). Plain cards (is_plain_card) become
+    LazyContact records that read only their FN/EMAIL/TEL lines; any other
+    card is parsed on the spot, with the same messages and counts as a text
+    read. Files that can't be mapped (empty, pipes) or that use bare CR line
+    endings, which the marker scan does not see, are read as text instead.
+    """
+    mm = None
+    with open(filename, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            pass
+    if mm is None or _LONE_CR_RE.search(mm):
+        if mm is not None:
+            mm.close()
+        with open(filename, 'r', encoding='utf-8') as f:
+            yield from _parse_card_texts(_split_card_texts(f, stats, report), stats, report)
+        return
+    def card_texts():
+        depth = 0
+        start = prev_end = 0
+        for m in _CARD_MARKER_RE.finditer(mm):
+            if m.group(1).upper() == b'BEGIN':
+                if depth == 0:
+                    start = m.start(1)
+                depth += 1
+                continue
+            if not depth:
+                continue
+            depth -= 1
+            if depth:
+                continue
+            end = m.end() + (mm[m.end():m.end() + 1] == b'\n')
+            # Text between cards is skipped, but must decode like a text-mode read
+            mm[prev_end:start].decode('utf-8')
+            prev_end = end
+            text = mm[start:end].decode('utf-8')
+            yield text.replace('\r\n', '\n') if '\r' in text else text
+        mm[prev_end:].decode('utf-8')
+        if depth:
+            report(_UNCLOSED_CARD)
+            stats['malformed'] += 1
+
+    with mm:
+        yield from _load_card_texts(card_texts(), stats, report)
+
+def _load_card_texts(texts, stats: Dict[str, int], report=print):
+    """_parse_card_texts() that defers plain cards as LazyContact records."""
+    for text in texts:
+        if is_plain_card(text):
+            stats['parsed_native'] += 1
+            contact = LazyContact(text)
+            if contact.fn:
+                stats['loaded'] += 1
+                yield contact
+            else:
+                stats['malformed'] += 1
+        else:
+            yield from _parse_card_texts((text,), stats, report)
+
+def scan_card_offsets(filename) -> List[int]:
+    """Return the offsets from iter_card_offsets as a list."""
+    return list(iter_card_offsets(filename))
+
+def plan_chunks(offsets: List[int], file_size: int, n_chunks: int) -> List[tuple]:
+    """Group card start offsets into about n_chunks contiguous (start, end) byte ranges.
+
+    Ranges cover the whole file, so any text between cards lands in exactly one
+    chunk and is handled the same way as in a serial read.
+    """
+    if not offsets or n_chunks <= 1:
+        return [(0, file_size)]
+    target = max(1, file_size // n_chunks)
+    bounds = [0]
+    for off in offsets[1:]:
+        if off - bounds[-1] >= target:
+            bounds.append(off)
+    bounds.append(file_size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _parse_chunk(filename, start: int, end: int, phone_region=None):
+    """Worker: parse the cards in one byte range of the file.
+
+    Plain cards come back as the (raw, fn, emails, tels) fields of their
+    LazyContact, which are far cheaper to pickle and unpickle than tokenized
+    properties; other cards come back as Contact records.
+    """
+    set_phone_region(phone_region)
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    stats = Counter()
+    messages: List[str] = []
+    # Same newline handling and decoding as the serial text-mode read
+    text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+    cards = [(card.raw, card.fn, card.emails, card.tels) if isinstance(card, LazyContact) else card
+             for card in _load_card_texts(_split_card_texts(text, stats, messages.append), stats, messages.append)]
+    return cards, dict(stats), messages
+
+def iter_vcards_parallel(filename, stats: Dict[str, int] = None, jobs: int = 0, report=print):
+    """Parse one large file across a process pool, yielding cards in file order.
+
+    The file is split on top-level BEGIN:VCARD boundaries into a few chunks per
+    worker; chunks are parsed concurrently and reassembled in their original
+    order. At most two chunks per worker are in flight, which bounds memory.
+    Malformed/loaded counts are summed into stats and parse errors are printed
+    in file order, exactly as the serial path would report them.
+    """
+    if stats is None:
+        stats = Counter()
+    jobs = jobs or os.cpu_count() or 1
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = plan_chunks(scan_card_offsets(filename), os.path.getsize(filename), jobs * 4)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunk_iter = iter(chunks)
+        pending = deque(pool.submit(_parse_chunk, filename, start, end, _phone_region)
+                        for start, end in itertools.islice(chunk_iter, jobs * 2))
+        while pending:
+            cards, chunk_stats, messages = pending.popleft().result()
+            nxt = next(chunk_iter, None)
+            if nxt is not None:
+                pending.append(pool.submit(_parse_chunk, filename, *nxt, _phone_region))
+            stats.update(chunk_stats)
+            for msg in messages:
+                report(msg)
+            for card in cards:
+                yield LazyContact.from_fields(*card) if isinstance(card, tuple) else card
+
 # Load vCards from a file, skip malformed cards
 def load_vcards(filename):
-    import vobject
-    from vobject.base import ParseError
-    vcards = []
-    malformed = 0
-    with open(filename, 'r', encoding='utf-8') as f:
-        data = f.read()
-    try:
-        for v in vobject.readComponents(data):
-            try:
-                fn = getattr(v, 'fn', None)
-                if fn and fn.value.strip():
-                    vcards.append(v)
-                else:
-                    malformed += 1
-            except Exception:
-                malformed += 1
-    except ParseError as e:
-        print(f"Parse error: {e}. Some vCards may be malformed and will be skipped.")
-        malformed += 1
-    return vcards, malformed
+    stats = Counter()
+    vcards = list(iter_vcards(filename, stats))
+    return vcards, stats['malformed']
+
+def compile_key_function(key_fields: List[str]):
+    """Compile dedupe key fields into a function returning a card's composite key.
+
+    Field dispatch happens once here instead of per card. FN/EMAIL/TEL come from
+    the Contact's normalized fields; all other requested properties are
+    collected in a single pass over the card's properties.
+    """
+    norm_fields = [f.strip().upper() for f in key_fields if f.strip()] or ['FN']
+    wanted = frozenset(f for f in norm_fields if f not in ('FN', 'EMAIL', 'TEL'))
+    n_wanted = len(wanted)
+    # Each step is (kind, field): 0 = FN, 1 = EMAIL, 2 = TEL, 3 = other property
+    plan = tuple(({'FN': 0, 'EMAIL': 1, 'TEL': 2}.get(f, 3), f) for f in norm_fields)
+
+    if plan == ((0, 'FN'),):
+        return lambda card: card.fn.lower()
+
+    def composite_key(card) -> str:
+        if wanted:
+            # One pass over the properties, keeping the first text value of each field
+            found = {}
+            for _group, name, _params, value in card.props:
+                if name in wanted and name not in found and isinstance(value, str):
+                    found[name] = value
+                    if len(found) == n_wanted:
+                        break
+        parts = []
+        for kind, field in plan:
+            if kind == 0:
+                parts.append(card.fn)
+            elif kind == 1:
+                parts.append('|'.join(sorted(set(card.emails))))
+            elif kind == 2:
+                parts.append('|'.join(sorted(set(card.tels))))
+            else:
+                value = found.get(field)
+                parts.append(value.strip() if value is not None else '')
+        return '||'.join(parts).lower()
+
+    return composite_key
 
 # Find duplicates by full name (FN), case-insensitive
 def find_duplicates(vcards, key_fields: List[str]):
     """Group cards by a composite key of the requested fields.
 
+    vcards: any iterable of Contact records, e.g. the iter_vcards() generator.
     key_fields: list of property names (case-insensitive) e.g. ['FN'] or ['FN','EMAIL'].
     For multivalued fields (EMAIL, TEL) we use a sorted joined list of normalized values.
     Missing fields become empty strings; key is lowercased for stability.
     """
-    norm_fields = [f.upper() for f in key_fields if f.strip()]
-    if not norm_fields:
+    if not any(f.strip() for f in key_fields):
         print("Warning: No valid dedupe key fields provided; using FN.")
-        norm_fields = ['FN']
+    composite_key = compile_key_function(key_fields)
     contacts: Dict[str, List] = defaultdict(list)
 
     for card in vcards:
-        key_parts = []
-        for field in norm_fields:
-            if field == 'FN':
-                fn = getattr(card, 'fn', None)
-                key_parts.append(fn.value.strip() if fn else '')
-            elif field in ('EMAIL', 'TEL'):
-                values = []
-                for child in card.getChildren():
-                    if child.name == field:
-                        val = getattr(child, 'value', '')
-                        if isinstance(val, str):
-                            val_norm = val.strip().lower()
-                            if field == 'TEL':
-                                digits = ''.join(ch for ch in val_norm if ch.isdigit())
-                                if digits:
-                                    val_norm = digits
-                            values.append(val_norm)
-                if values:
-                    values = sorted(set(values))
-                key_parts.append('|'.join(values))
-            else:
-                values = []
-                for child in card.getChildren():
-                    if child.name == field:
-                        val = getattr(child, 'value', '')
-                        if isinstance(val, str):
-                            values.append(val.strip())
-                key_parts.append(values[0] if values else '')
-        composite = '||'.join(key_parts).lower()
-        contacts[composite].append(card)
+        contacts[composite_key(card)].append(card)
+    return contacts
+
+class DisjointSet:
+    """Union-find over integer ids with path halving and union by size."""
+    __slots__ = ('parent', 'size')
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        """Join the sets of a and b; return False if they were already joined."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+# --- Fuzzy name matching ------------------------------------------------------
+# Similar names are found without comparing every pair: names are first put in
+# blocks (phonetic codes and/or MinHash LSH bands over character trigrams) and
+# only names sharing a block are scored.
+
+FUZZY_BLOCKING = ('phonetic', 'minhash')
+_SOUNDEX_CODES = {c: d for d, letters in enumerate(
+    ('aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r')) for c in letters}
+_MINHASH_BANDS = 10
+_MINHASH_ROWS = 3
+# One fixed XOR salt per MinHash function (deterministic across runs, unlike hash())
+_MINHASH_SALTS = random.Random(20240601).sample(range(1 << 32), _MINHASH_BANDS * _MINHASH_ROWS)
+
+def normalize_name(fn: str) -> str:
+    """Lowercase, strip accents/punctuation, turn "Smith, John" into "john smith",
+    then sort the tokens so word order does not matter."""
+    text = unicodedata.normalize('NFKD', fn)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    if text.count(',') == 1:
+        last, _, first = text.partition(',')
+        text = f"{first} {last}"
+    return ' '.join(sorted(re.findall(r'[^\W_]+', text)))
+
+def soundex(token: str) -> str:
+    """American Soundex code of one token (letters only), e.g. 'smith' -> 'S530'."""
+    letters = [ch for ch in token if 'a' <= ch <= 'z']
+    if not letters:
+        return token
+    code = letters[0].upper()
+    prev = _SOUNDEX_CODES.get(letters[0], 0)
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, 0)
+        if digit and digit != prev:
+            code += str(digit)
+            if len(code) == 4:
+                break
+        if ch not in 'hw':
+            prev = digit
+    return code.ljust(4, '0')
+
+def name_blocking_keys(norm: str, blocking) -> List[tuple]:
+    """Blocking keys for a normalized name; names sharing any key get compared."""
+    keys = []
+    tokens = norm.split()
+    if 'phonetic' in blocking and tokens:
+        codes = sorted({soundex(t) for t in tokens})
+        if len(codes) == 1:
+            keys.append(('P', codes[0]))
+        else:
+            # Every pair of token codes, so an extra middle name still collides
+            keys.extend(('P', a, b) for a, b in itertools.combinations(codes, 2))
+    if 'minhash' in blocking and norm:
+        padded = f" {norm} "
+        grams = {zlib.crc32(padded[k:k + 3].encode('utf-8')) for k in range(len(padded) - 2)}
+        sig = [min([g ^ salt for g in grams]) for salt in _MINHASH_SALTS]
+        for band in range(_MINHASH_BANDS):
+            keys.append(('M', band, *sig[band * _MINHASH_ROWS:(band + 1) * _MINHASH_ROWS]))
+    return keys
+
+def name_similarity(a: str, b: str, threshold: float = 0.0) -> float:
+    """difflib ratio of two normalized names; 0.0 early if cheap bounds rule it out."""
+    sm = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    if sm.real_quick_ratio() < threshold or sm.quick_ratio() < threshold:
+        return 0.0
+    return sm.ratio()
+
+def _check_fuzzy_options(threshold: float, blocking) -> tuple:
+    """Validate fuzzy options; return the normalized blocking methods."""
+    blocking = tuple(b.strip().lower() for b in blocking if b.strip())
+    unknown = set(blocking).difference(FUZZY_BLOCKING)
+    if unknown or not blocking:
+        raise ValueError(f"Unsupported fuzzy blocking: {', '.join(sorted(unknown)) or '(none)'}")
+    if not 0.0 <= threshold <= 1.0:
+        raise ValueError(f"Fuzzy threshold must be between 0 and 1, got {threshold}")
+    return blocking
+
+_BUCKET_ORDER = ('2', '3-5', '6-20', '21-100', '101-1000', '>1000')
+
+def _size_bucket(size: int) -> str:
+    for limit, label in ((2, '2'), (5, '3-5'), (20, '6-20'), (100, '21-100'), (1000, '101-1000')):
+        if size <= limit:
+            return label
+    return '>1000'
+
+def link_similar_names(names: List[str], dsu: DisjointSet, threshold: float,
+                       blocking=FUZZY_BLOCKING, max_block: int = 1000) -> Dict[str, object]:
+    """Union the ids of names whose normalized forms score >= threshold.
+
+    names[i] belongs to id i of dsu. Identical normalized names are joined
+    directly; distinct ones are blocked and scored only within their blocks.
+    Blocks larger than max_block are skipped (and counted) to bound the work.
+    Returns stats: distinct names, block count and size histogram, pairs
+    compared and matches found.
+    """
+    blocking = _check_fuzzy_options(threshold, blocking)
+    first_ids: Dict[str, int] = {}
+    distinct: List[tuple] = []
+    for i, fn in enumerate(names):
+        norm = normalize_name(fn)
+        j = first_ids.setdefault(norm, i)
+        if j == i:
+            distinct.append((norm, i))
+        else:
+            dsu.union(i, j)
+    del first_ids
+
+    blocks: Dict[tuple, List[int]] = defaultdict(list)
+    for u, (norm, _i) in enumerate(distinct):
+        for key in name_blocking_keys(norm, blocking):
+            blocks[key].append(u)
+
+    stats = Counter()
+    histogram = Counter()
+    compared = set()
+    for members in blocks.values():
+        size = len(members)
+        if size < 2:
+            continue
+        stats['blocks'] += 1
+        stats['max_block'] = max(stats['max_block'], size)
+        histogram[_size_bucket(size)] += 1
+        if size > max_block:
+            stats['oversized_blocks'] += 1
+            continue
+        for x in range(size):
+            ux = members[x]
+            norm_x, id_x = distinct[ux]
+            for uy in members[x + 1:]:
+                norm_y, id_y = distinct[uy]
+                if dsu.find(id_x) == dsu.find(id_y):
+                    continue
+                pair = (ux, uy) if ux < uy else (uy, ux)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                stats['comparisons'] += 1
+                if name_similarity(norm_x, norm_y, threshold) >= threshold:
+                    dsu.union(id_x, id_y)
+                    stats['matches'] += 1
+    stats['distinct_names'] = len(distinct)
+    return {**stats, 'block_sizes': dict(sorted(histogram.items(), key=lambda kv: _BUCKET_ORDER.index(kv[0])))}
+
+def print_fuzzy_summary(stats: Dict[str, object]):
+    sizes = ', '.join(f"{label}: {count}" for label, count in stats['block_sizes'].items()) or 'none'
+    print(f"Fuzzy names: {stats.get('distinct_names', 0)} distinct names, {stats.get('blocks', 0)} blocks "
+          f"(largest {stats.get('max_block', 0)}; sizes {sizes}), "
+          f"{stats.get('comparisons', 0)} comparisons, {stats.get('matches', 0)} matches.")
+    if stats.get('oversized_blocks'):
+        print(f"  Skipped {stats['oversized_blocks']} blocks larger than the block size limit.")
+
+CLUSTER_FIELDS = ('EMAIL', 'TEL')
+
+def cluster_duplicates(vcards, key_fields: List[str], cluster_fields: List[str] = (),
+                       fuzzy_threshold: float = None, fuzzy_blocking=FUZZY_BLOCKING,
+                       fuzzy_max_block: int = 1000):
+    """Group cards transitively: same composite key OR any shared EMAIL/TEL value.
+
+    Each card's dedupe key and normalized identifiers (lowercased emails,
+    digit-only phone numbers) go into an inverted index that maps a value to
+    the first card that had it; every later card carrying the value is joined
+    to that card with union-find. This is near-linear in the number of cards
+    and never compares cards pairwise. Returns the same {key: [cards]} mapping
+    as find_duplicates, keyed by each cluster's first card's composite key.
+
+    fuzzy_threshold: if set, also join cards whose FN values are similar (see
+    link_similar_names; fuzzy_blocking and fuzzy_max_block are passed on).
+    """
+    fields = {f.strip().upper() for f in cluster_fields if f.strip()}
+    unknown = fields.difference(CLUSTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported cluster field(s): {', '.join(sorted(unknown))}")
+    if fuzzy_threshold is not None:
+        _check_fuzzy_options(fuzzy_threshold, fuzzy_blocking)
+    use_email = 'EMAIL' in fields
+    use_tel = 'TEL' in fields
+    composite_key = compile_key_function(key_fields)
+
+    cards = []
+    keys: List[str] = []
+    dsu = DisjointSet()
+    index: Dict[tuple, int] = {}
+    linked = 0
+    for card in vcards:
+        i = dsu.add()
+        cards.append(card)
+        key = composite_key(card)
+        keys.append(key)
+        idents = [('KEY', key)]
+        if use_email:
+            idents.extend(('EMAIL', e) for e in card.emails if e)
+        if use_tel:
+            idents.extend(('TEL', t) for t in card.tels if t.isdigit())
+        for ident in idents:
+            j = index.setdefault(ident, i)
+            if j != i and dsu.union(i, j) and ident[0] != 'KEY':
+                linked += 1
+    del index
+
+    if fuzzy_threshold is not None:
+        fuzzy_stats = link_similar_names([c.fn for c in cards], dsu, fuzzy_threshold,
+                                         fuzzy_blocking, fuzzy_max_block)
+        print_fuzzy_summary(fuzzy_stats)
+
+    contacts: Dict[str, List] = {}
+    root_keys: Dict[int, str] = {}
+    for i, card in enumerate(cards):
+        root = dsu.find(i)
+        key = root_keys.get(root)
+        if key is None:
+            key = root_keys[root] = keys[i]
+            contacts[key] = []
+        contacts[key].append(card)
+    msg = f"Clustering: {len(cards)} cards in {len(contacts)} groups"
+    if fields:
+        msg += f"; {linked} joins through shared {'/'.join(f.lower() for f in CLUSTER_FIELDS if f in fields)}"
+    print(msg + ".")
     return contacts
 
+# --- Out-of-core store (--store sqlite:PATH) -------------------------------------
+
+class SQLiteStore:
+    """Disk-backed card store for inputs that do not fit in memory.
+
+    Cards are streamed into a SQLite database with their dedupe key and
+    normalized emails/phones in indexed columns; grouping runs as SQL queries
+    and groups are read back one at a time, so memory stays bounded by the
+    largest duplicate group rather than the input size. Groups come back in
+    the same order, with the same keys, as find_duplicates/cluster_duplicates.
+
+    The database must be new or a store kept from an earlier run (marked by
+    its MARKER table); any other existing database is refused rather than
+    overwritten. close() deletes the file unless keep is set.
+    """
+
+    BATCH = 10000
+    MARKER = 'merge_vcards_store'
+
+    def __init__(self, path: str, keep: bool = False):
+        self.path = path
+        self.keep = keep
+        self.conn = sqlite3.connect(path)
+        try:
+            tables = {name for name, in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        except sqlite3.Error:
+            self.conn.close()
+            raise
+        if tables and self.MARKER not in tables:
+            self.conn.close()
+            raise ValueError(f"Store database {path} already holds other tables; "
+                             f"use a new file for --store")
+        # Scratch data: trade durability for insert speed
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript(f"""
+            DROP TABLE IF EXISTS cards;
+            DROP TABLE IF EXISTS idents;
+            CREATE TABLE IF NOT EXISTS {self.MARKER} (version INTEGER);
+            CREATE TABLE cards (id INTEGER PRIMARY KEY, key TEXT, fn TEXT, raw TEXT, props BLOB, comp INTEGER);
+            CREATE TABLE idents (card_id INTEGER, kind TEXT, value TEXT);
+        """)
+        self.count = 0
+
+    @classmethod
+    def from_spec(cls, spec: str, keep: bool = False) -> 'SQLiteStore':
+        """Open a store from a --store value such as sqlite:contacts.db."""
+        scheme, _, path = spec.partition(':')
+        if scheme.lower() != 'sqlite' or not path:
+            raise ValueError(f"Unsupported store '{spec}' (expected sqlite:PATH)")
+        return cls(path, keep)
+
+    def add_cards(self, vcards, key_fields: List[str], cluster_fields: List[str] = ()):
+        """Stream Contact records into the store, computing keys and identifiers on the way."""
+        composite_key = compile_key_function(key_fields)
+        use_email = 'EMAIL' in cluster_fields
+        use_tel = 'TEL' in cluster_fields
+        card_rows, ident_rows = [], []
+        for card in vcards:
+            i = self.count
+            self.count += 1
+            card_rows.append((i, composite_key(card), card.fn, card.raw,
+                              pickle.dumps(card.props, pickle.HIGHEST_PROTOCOL)))
+            if use_email:
+                ident_rows.extend((i, 'EMAIL', e) for e in set(card.emails) if e)
+            if use_tel:
+                ident_rows.extend((i, 'TEL', t) for t in set(card.tels) if t.isdigit())
+            if len(card_rows) >= self.BATCH:
+                self._flush(card_rows, ident_rows)
+        self._flush(card_rows, ident_rows)
+        self.conn.execute("CREATE INDEX cards_key ON cards (key)")
+        self.conn.execute("CREATE INDEX idents_value ON idents (kind, value)")
+
+    def _flush(self, card_rows: list, ident_rows: list):
+        self.conn.executemany("INSERT INTO cards (id, key, fn, raw, props) VALUES (?, ?, ?, ?, ?)", card_rows)
+        self.conn.executemany("INSERT INTO idents VALUES (?, ?, ?)", ident_rows)
+        self.conn.commit()
+        card_rows.clear()
+        ident_rows.clear()
+
+    def group(self, fuzzy_threshold: float = None, fuzzy_blocking=FUZZY_BLOCKING,
+              fuzzy_max_block: int = 1000) -> int:
+        """Assign every card to a group (cards.comp = id of the group's first card).
+
+        Cards with the same key always share a group. Identifiers shared by
+        several cards (and fuzzy name matches) then join groups transitively,
+        each joined group taking the smallest label among them. Returns the number
+        of joins made through shared EMAIL/TEL values, as cluster_duplicates
+        reports it (fuzzy matches are not counted).
+        """
+        db = self.conn
+        db.executescript("""
+            CREATE TEMP TABLE first_by_key AS SELECT key, MIN(id) AS first FROM cards GROUP BY key;
+            CREATE UNIQUE INDEX temp.first_by_key_key ON first_by_key (key);
+            UPDATE cards SET comp = (SELECT first FROM first_by_key WHERE first_by_key.key = cards.key);
+        """)
+        key_groups = db.execute("SELECT COUNT(*) FROM first_by_key").fetchone()[0]
+        db.execute("DROP TABLE first_by_key")
+        # Only identifiers carried by more than one card can join groups
+        db.executescript("""
+            CREATE TEMP TABLE links AS
+                SELECT card_id, kind, value FROM idents WHERE (kind, value) IN
+                    (SELECT kind, value FROM idents GROUP BY kind, value HAVING COUNT(*) > 1);
+            CREATE INDEX temp.links_value ON links (kind, value);
+            CREATE INDEX temp.links_card ON links (card_id);
+            CREATE INDEX cards_comp ON cards (comp);
+        """)
+        self._propagate_labels()
+        linked = key_groups - self._count_groups()
+        if fuzzy_threshold is not None:
+            self._link_fuzzy_names(fuzzy_threshold, fuzzy_blocking, fuzzy_max_block)
+            self._propagate_labels()
+        self.groups = self._count_groups()
+        db.execute("DROP TABLE links")
+        db.commit()
+        return linked
+
+    def _propagate_labels(self):
+        """Relabel groups joined through links with the smallest label among them.
+
+        The links are streamed in identifier order into a union-find over the
+        labels that carry links, so only those labels are held in memory and
+        long chains of joins cost no more than short ones.
+        """
+        db = self.conn
+        rows = db.execute("""
+            SELECT l.kind, l.value, c.comp FROM links l JOIN cards c ON c.id = l.card_id
+            ORDER BY l.kind, l.value
+        """)
+        dsu = DisjointSet()
+        ids: Dict[int, int] = {}
+        labels: List[int] = []
+        previous = None
+        for kind, value, comp in rows:
+            i = ids.get(comp)
+            if i is None:
+                i = ids[comp] = dsu.add()
+                labels.append(comp)
+            if previous is not None and previous[0] == (kind, value):
+                dsu.union(previous[1], i)
+            previous = ((kind, value), i)
+        del ids
+        lowest: Dict[int, int] = {}
+        for i, label in enumerate(labels):
+            root = dsu.find(i)
+            if label < lowest.get(root, label + 1):
+                lowest[root] = label
+        db.execute("CREATE TEMP TABLE relabel (old INTEGER PRIMARY KEY, comp INTEGER)")
+        db.executemany("INSERT INTO relabel VALUES (?, ?)",
+                       ((label, lowest[dsu.find(i)]) for i, label in enumerate(labels)
+                        if lowest[dsu.find(i)] != label))
+        db.execute("""
+            UPDATE cards SET comp = (SELECT comp FROM relabel WHERE old = cards.comp)
+            WHERE comp IN (SELECT old FROM relabel)
+        """)
+        db.execute("DROP TABLE relabel")
+
+    def _count_groups(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT comp) FROM cards").fetchone()[0]
+
+    def _link_fuzzy_names(self, threshold: float, blocking, max_block: int):
+        """Add fuzzy name matches to the links table as ('FUZZY', name id) identifiers.
+
+        Only the distinct FN values are held in memory, not the cards.
+        """
+        db = self.conn
+        names = [fn for fn, in db.execute("SELECT fn FROM cards GROUP BY fn ORDER BY MIN(id)")]
+        name_ids = {fn: i for i, fn in enumerate(names)}
+        dsu = DisjointSet()
+        for _ in names:
+            dsu.add()
+        # Names already in one group count as joined, as they do in cluster_duplicates
+        previous = None
+        for comp, fn in db.execute("SELECT DISTINCT comp, fn FROM cards ORDER BY comp"):
+            if previous is not None and previous[0] == comp:
+                dsu.union(previous[1], name_ids[fn])
+            previous = (comp, name_ids[fn])
+        del name_ids
+        print_fuzzy_summary(link_similar_names(names, dsu, threshold, blocking, max_block))
+        roots = [dsu.find(i) for i in range(len(names))]
+        sizes = Counter(roots)
+        db.execute("CREATE TEMP TABLE fuzzy (fn TEXT PRIMARY KEY, root INTEGER)")
+        db.executemany("INSERT INTO fuzzy VALUES (?, ?)",
+                       ((fn, root) for fn, root in zip(names, roots) if sizes[root] > 1))
+        db.execute("""
+            INSERT INTO links SELECT c.id, 'FUZZY', f.root FROM cards c JOIN fuzzy f ON f.fn = c.fn
+        """)
+        db.execute("DROP TABLE fuzzy")
+
+    def iter_groups(self):
+        """Yield (key, [Contact, ...]) per group, ordered by each group's first card."""
+        rows = self.conn.execute("SELECT comp, key, raw, props FROM cards ORDER BY comp, id")
+        for _comp, members in itertools.groupby(rows, key=lambda row: row[0]):
+            group = []
+            key = None
+            for _c, card_key, raw, props in members:
+                if key is None:
+                    key = card_key
+                group.append(Contact(pickle.loads(props), raw))
+            yield key, group
+
+    def close(self):
+        self.conn.close()
+        if not self.keep and self.path != ':memory:':
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+def store_duplicates(vcards, store: SQLiteStore, key_fields: List[str], cluster_fields: List[str] = (),
+                     fuzzy_threshold: float = None, fuzzy_blocking=FUZZY_BLOCKING,
+                     fuzzy_max_block: int = 1000):
+    """find_duplicates/cluster_duplicates through a SQLiteStore; returns store.iter_groups()."""
+    fields = {f.strip().upper() for f in cluster_fields if f.strip()}
+    unknown = fields.difference(CLUSTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported cluster field(s): {', '.join(sorted(unknown))}")
+    if fuzzy_threshold is not None:
+        _check_fuzzy_options(fuzzy_threshold, fuzzy_blocking)
+    if not fields and fuzzy_threshold is None and not any(f.strip() for f in key_fields):
+        print("Warning: No valid dedupe key fields provided; using FN.")
+    store.add_cards(vcards, key_fields, fields)
+    linked = store.group(fuzzy_threshold, fuzzy_blocking, fuzzy_max_block)
+    if fields or fuzzy_threshold is not None:
+        msg = f"Clustering: {store.count} cards in {store.groups} groups"
+        if fields:
+            msg += f"; {linked} joins through shared {'/'.join(f.lower() for f in CLUSTER_FIELDS if f in fields)}"
+        print(msg + ".")
+    return store.iter_groups()
+
+def merge_group_stream(groups, counts: Dict[str, int], safe_merge: bool = False, merge_log: List[str] = None):
+    """Merge (key, group) pairs one at a time, yielding output cards.
+
+    counts receives 'merged' (duplicates merged) and 'unique' (cards yielded).
+    """
+    for key, group in groups:
+        merged, merged_count = merge_contacts({key: group}, safe_merge, merge_log)
+        counts['merged'] += merged_count
+        counts['unique'] += len(merged)
+        yield from merged
+
+# --- External-sort dedupe (--spill-dir) -----------------------------------------
+
+def iter_card_spans(filename):
+    """Yield (start, end) byte ranges holding one top-level card each.
+
+    Like plan_chunks with one card per chunk, the ranges cover the whole file,
+    so parsing every range gives exactly the cards of a serial read.
+    """
+    start = None
+    for offset in iter_card_offsets(filename):
+        if start is not None:
+            yield start, offset
+            start = offset
+        else:
+            start = 0
+    if start is not None:
+        yield start, os.path.getsize(filename)
+
+def _read_span(f, start: int, end: int):
+    f.seek(start)
+    # Same newline handling and decoding as the serial text-mode read
+    return io.TextIOWrapper(io.BytesIO(f.read(end - start)), encoding='utf-8')
+
+# Runs merged at once; more runs are first merged into intermediate runs
+_MERGE_FAN_IN = 64
+
+def _write_run(records, spill_dir: str) -> str:
+    fd, path = tempfile.mkstemp(suffix='.run', dir=spill_dir)
+    with os.fdopen(fd, 'wb') as f:
+        for record in records:
+            f.write(pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+    return path
+
+def _read_run(path: str):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                break
+    os.remove(path)
+
+def sort_to_runs(records, spill_dir: str, run_size: int) -> List[str]:
+    """Consume records into sorted run files of at most run_size records each.
+
+    Records are pickled one after another, so any tuple of plain values works.
+    Returns the run file paths for merge_runs.
+    """
+    records = iter(records)
+    paths: List[str] = []
+    while True:
+        batch = list(itertools.islice(records, run_size))
+        if not batch:
+            return paths
+        batch.sort()
+        paths.append(_write_run(batch, spill_dir))
+        del batch
+
+def merge_runs(paths: List[str], spill_dir: str):
+    """k-way merge of sort_to_runs output; run files are removed once read.
+
+    At most _MERGE_FAN_IN files are open at a time.
+    """
+    paths = list(paths)
+    while len(paths) > _MERGE_FAN_IN:
+        batch, paths = paths[:_MERGE_FAN_IN], paths[_MERGE_FAN_IN:]
+        paths.append(_write_run(heapq.merge(*(_read_run(p) for p in batch)), spill_dir))
+    return heapq.merge(*(_read_run(p) for p in paths))
+
+def _group_spans(records):
+    """(key, start, end) records sorted by key -> (first start, key, spans) per key."""
+    for key, members in itertools.groupby(records, key=lambda r: r[0]):
+        spans = tuple((start, end) for _key, start, end in members)
+        yield spans[0][0], key, spans
+
+def spill_duplicates(filename, key_fields: List[str], stats: Dict[str, int], spill_dir: str,
+                     run_size: int = 1000000):
+    """find_duplicates with bounded memory, for archives that do not fit in RAM.
+
+    Each card's (composite key, byte range) is written to sorted runs on disk
+    and k-way merged, so cards with the same key arrive together; the groups
+    are then sorted again by their first card's position, which restores
+    find_duplicates' group order. The input is fully read (and stats filled)
+    before this returns; the returned generator yields (key, [Contact, ...])
+    one group at a time by re-reading the group's cards from the file. Peak
+    memory is one run buffer plus one group.
+    """
+    if not any(f.strip() for f in key_fields):
+        print("Warning: No valid dedupe key fields provided; using FN.")
+    composite_key = compile_key_function(key_fields)
+    work_dir = tempfile.mkdtemp(prefix='merge_vcards-', dir=spill_dir)
+
+    def keyed_spans():
+        with open(filename, 'rb') as f:
+            for start, end in iter_card_spans(filename):
+                for card in _parse_card_texts(_split_card_texts(_read_span(f, start, end), stats), stats):
+                    yield composite_key(card), start, end
+
+    try:
+        key_runs = sort_to_runs(keyed_spans(), work_dir, run_size)
+        group_runs = sort_to_runs(_group_spans(merge_runs(key_runs, work_dir)), work_dir, run_size)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    def groups():
+        quiet = Counter()
+        try:
+            with open(filename, 'rb') as f:
+                for _first, key, spans in merge_runs(group_runs, work_dir):
+                    group = []
+                    for start, end in spans:
+                        texts = _split_card_texts(_read_span(f, start, end), quiet, lambda msg: None)
+                        group.extend(_parse_card_texts(texts, quiet, lambda msg: None))
+                    yield key, group
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return groups()
+
+# Properties a merged card never takes from its duplicates (one VERSION, one name)
+_NOT_MERGED = ('N', 'FN', 'VERSION')
+
+def shared_evidence(group) -> tuple:
+    """(shared email, shared phone) for a group: does any normalized email / phone
+    number appear on more than one of its cards? This is the --safe-merge test."""
+    email_counter = Counter()
+    phone_counter = Counter()
+    for c in group:
+        email_counter.update(set(c.emails))
+        phone_counter.update({t for t in c.tels if t.isdigit()})
+    return (any(cnt > 1 for cnt in email_counter.values()),
+            any(cnt > 1 for cnt in phone_counter.values()))
+
+def _new_properties(group_props) -> tuple:
+    """Properties of the later cards in a group that the first card lacks, in card order.
+
+    group_props: each card's props. Properties are compared by fingerprint, so
+    a property is added only if it would serialize to a line not seen yet;
+    values are compared as written, so a value that differs only in case
+    (a@x.com, A@X.COM) is kept as a separate property.
+    """
+    # Compare property fingerprints instead of serializing every line
+    seen = {
+        property_fingerprint(prop) for prop in group_props[0]
+        if prop[1] not in _NOT_MERGED
+    }
+    added = []
+    for props in group_props[1:]:
+        for prop in props:
+            if prop[1] in _NOT_MERGED:
+                continue
+            fingerprint = property_fingerprint(prop)
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            added.append(prop)
+    return tuple(added)
+
 # Merge duplicate vCards: combine all unique fields, but only one N and FN field
-def merge_contacts(contacts, safe_merge: bool = False, merge_log: List[str] = None):
+def merge_contacts(contacts, safe_merge: bool = False, merge_log: List[str] = None, jobs: int = 1):
     """Merge grouped contacts.
 
     safe_merge: if True, only merge a duplicate group when there is strong evidence
     they represent the same person (shared normalized email or phone). Otherwise
     the group is left unmerged (all cards kept).
     merge_log: optional list to append human-readable merge decisions.
+    jobs: merge duplicate groups across this many worker processes (0 = one
+    per CPU; see _merge_groups_parallel). Output and log are identical to jobs=1.
     """
     merged = []
     merged_count = 0
+    pending = [] if jobs != 1 else None
 
     for key, group in contacts.items():
         # Single card -> nothing to merge
@@ -126,32 +1470,7 @@ def merge_contacts(contacts, safe_merge: bool = False, merge_log: List[str] = No
             merged.append(group[0])
             continue
 
-        def extract_norm(card):
-            emails = []
-            phones = []
-            for line in card.getChildren():
-                if line.name == 'EMAIL':
-                    val = getattr(line, 'value', '')
-                    if isinstance(val, str):
-                        emails.append(val.strip().lower())
-                elif line.name == 'TEL':
-                    val = getattr(line, 'value', '')
-                    if isinstance(val, str):
-                        digits = ''.join(ch for ch in val if ch.isdigit())
-                        if digits:
-                            phones.append(digits)
-            return set(emails), set(phones)
-
-        cards_norm = [extract_norm(c) for c in group]
-        email_counter = Counter()
-        phone_counter = Counter()
-        for emails, phones in cards_norm:
-            email_counter.update(emails)
-            phone_counter.update(phones)
-        has_shared_email = any(cnt > 1 for cnt in email_counter.values())
-        has_shared_phone = any(cnt > 1 for cnt in phone_counter.values())
-
-        if safe_merge and not (has_shared_email or has_shared_phone):
+        if safe_merge and not any(shared_evidence(group)):
             merged.extend(group)
             if merge_log is not None:
                 merge_log.append(
@@ -159,33 +1478,577 @@ def merge_contacts(contacts, safe_merge: bool = False, merge_log: List[str] = No
                 )
             continue
 
-        base = group[0]
-        seen_lines = {
-            child.serialize() for child in base.getChildren()
-            if child.name not in ("N", "FN")
-        }
-        added_lines = 0
-
-        for card in group[1:]:
-            for line in card.getChildren():
-                if line.name in ("N", "FN"):
-                    continue
-                line_str = line.serialize()
-                if line_str in seen_lines:
-                    continue
-                seen_lines.add(line_str)
-                base.add(line)
-                added_lines += 1
-
-        merged.append(base)
         merged_count += len(group) - 1
+        if pending is not None:
+            # Filled in by the worker pool; keep the group's place in the output and the log
+            pending.append((key, group, len(merged), len(merge_log) if merge_log is not None else None))
+            merged.append(None)
+            if merge_log is not None:
+                merge_log.append(None)
+            continue
+
+        # The merged card keeps the base card's text; new properties are appended on output
+        base = group[0]
+        added = _new_properties([c.props for c in group])
+        merged.append(Contact(base.props + added, base.raw, base.added + added))
         if merge_log is not None:
             merge_log.append(
-                f"MERGED key={key} cards={len(group)} added_fields={added_lines}"
+                f"MERGED key={key} cards={len(group)} added_fields={len(added)}"
             )
 
+    if pending:
+        _merge_groups_parallel(pending, merged, merge_log, jobs)
     return merged, merged_count
 
+# Below this many cards in duplicate groups, starting a pool costs more than it saves
+_PARALLEL_MERGE_MIN_CARDS = 20000
+
+def _merge_group_batch(batch):
+    """Worker: (base props or None, new properties) for each group in batch.
+
+    Each group is a list of its cards' props, or the raw text of plain cards
+    not tokenized yet, which are tokenized here instead of in the parent. The
+    base card's props are returned only when the worker tokenized them.
+    """
+    results = []
+    for members in batch:
+        group_props = [m if isinstance(m, tuple) else Contact.from_tokens(tokenize_vcard(m), m).props
+                       for m in members]
+        results.append((group_props[0] if isinstance(members[0], str) else None, _new_properties(group_props)))
+    return results
+
+def _merge_groups_parallel(pending, merged: List, merge_log: List[str], jobs: int):
+    """Merge the groups merge_contacts() deferred and put the cards and log lines in their places.
+
+    pending: (key, group, output index, log index) per group, in output order.
+    Groups are cut into consecutive batches of about equal card counts, a few
+    per worker, so one huge group does not leave the other workers idle for
+    long; results come back in batch order.
+    """
+    total = sum(len(group) for _key, group, _slot, _log_slot in pending)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or total < _PARALLEL_MERGE_MIN_CARDS:
+        batches = [pending]
+        results = [_merge_group_batch([[c.props for c in group] for _key, group, _slot, _log_slot in pending])]
+    else:
+        target = max(1, total // (jobs * 4))
+        batches = [[]]
+        size = 0
+        for item in pending:
+            if size >= target:
+                batches.append([])
+                size = 0
+            batches[-1].append(item)
+            size += len(item[1])
+        payloads = ([[c.raw if isinstance(c, LazyContact) and c._props is None else c.props for c in group]
+                     for _key, group, _slot, _log_slot in batch] for batch in batches)
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_merge_group_batch, payloads))
+    for batch, batch_results in zip(batches, results):
+        for (key, group, slot, log_slot), (base_props, added) in zip(batch, batch_results):
+            base = group[0]
+            if base_props is None:
+                base_props = base.props
+            merged[slot] = Contact(base_props + added, base.raw, base.added + added)
+            if log_slot is not None:
+                merge_log[log_slot] = f"MERGED key={key} cards={len(group)} added_fields={len(added)}"
+
+# --- Duplicate statistics (--stats-only) ------------------------------------------
+
+_LARGEST_GROUPS = 10
+
+def duplicate_stats(groups) -> Dict[str, object]:
+    """Statistics of (key, [cards]) pairs without merging anything.
+
+    Counts groups and duplicates, buckets duplicate group sizes, and runs the
+    --safe-merge evidence check on every duplicate group. Only the cards'
+    normalized emails and phone numbers are read, so plain cards are never
+    tokenized and no card is changed.
+    """
+    stats = Counter()
+    histogram = Counter()
+    largest = []  # min-heap of (size, key)
+    for key, group in groups:
+        size = len(group)
+        stats['cards'] += size
+        stats['groups'] += 1
+        if size == 1:
+            continue
+        stats['duplicate_groups'] += 1
+        stats['cards_in_duplicate_groups'] += size
+        stats['duplicates'] += size - 1
+        histogram[_size_bucket(size)] += 1
+        if len(largest) < _LARGEST_GROUPS:
+            heapq.heappush(largest, (size, key))
+        elif size > largest[0][0]:
+            heapq.heapreplace(largest, (size, key))
+        shared_email, shared_phone = shared_evidence(group)
+        stats['shared_email_groups'] += shared_email
+        stats['shared_phone_groups'] += shared_phone
+        if shared_email or shared_phone:
+            stats['safe_duplicates'] += size - 1
+        else:
+            stats['unsafe_groups'] += 1
+            stats['cards_in_unsafe_groups'] += size
+    return {
+        'cards': stats['cards'],
+        'groups': stats['groups'],
+        'duplicate_groups': stats['duplicate_groups'],
+        'cards_in_duplicate_groups': stats['cards_in_duplicate_groups'],
+        'duplicates': stats['duplicates'],
+        'group_sizes': dict(sorted(histogram.items(), key=lambda kv: _BUCKET_ORDER.index(kv[0]))),
+        'largest_groups': [{'key': key, 'size': size} for size, key in sorted(largest, key=lambda sk: -sk[0])],
+        'safe_merge': {
+            'shared_email_groups': stats['shared_email_groups'],
+            'shared_phone_groups': stats['shared_phone_groups'],
+            'skipped_groups': stats['unsafe_groups'],
+            'cards_kept_separate': stats['cards_in_unsafe_groups'],
+            'duplicates': stats['safe_duplicates'],
+        },
+    }
+
+def write_stats_json(stats: Dict[str, object], path: str, input_file, key_fields: List[str], args):
+    data = {'input': input_file, 'dedupe_key': key_fields or ['FN'], 'cluster': args.cluster,
+            'fuzzy': args.fuzzy, 'phone_region': args.phone_region, **stats}
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"Duplicate statistics written to {path}")
+    except OSError as e:
+        print(f"Failed to write duplicate statistics: {e}")
+
+def print_duplicate_stats(stats: Dict[str, object], key_fields: List[str]):
+    sizes = ', '.join(f"{label}: {count}" for label, count in stats['group_sizes'].items()) or 'none'
+    safe = stats['safe_merge']
+    print(f"Duplicate statistics for key {','.join(key_fields) or 'FN'} (nothing merged or written):")
+    print(f"  {stats['cards']} cards in {stats['groups']} groups; {stats['duplicate_groups']} groups have duplicates "
+          f"({stats['cards_in_duplicate_groups']} cards, sizes {sizes})")
+    print(f"  Merging would leave {stats['groups']} contacts ({stats['duplicates']} duplicates merged)")
+    print(f"  Safe merge: {stats['duplicate_groups'] - safe['skipped_groups']} groups share an email or phone "
+          f"({safe['shared_email_groups']} email, {safe['shared_phone_groups']} phone); "
+          f"{safe['skipped_groups']} groups ({safe['cards_kept_separate']} cards) would be kept separate, "
+          f"leaving {stats['cards'] - safe['duplicates']} contacts")
+    if stats['largest_groups']:
+        print("  Largest groups: " + ', '.join(f"{g['key']!r} ({g['size']})" for g in stats['largest_groups'][:5]))
+
+# --- Parse cache (--cache-dir) ------------------------------------------------
+
+CACHE_VERSION = 3
+CACHE_ENV = 'MERGE_VCARDS_CACHE_DIR'
+_CACHE_SUFFIX = '.pcache'
+_HASH_BLOCK = 1 << 20
+
+def file_digest(filename) -> str:
+    """Content hash (blake2b) of a whole file, read in 1 MB blocks."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class ParseCache:
+    """Parsed cards of whole input files, reused while a file's content is unchanged.
+
+    Entries are zlib-compressed pickles named by the file's content hash. index.json maps each
+    input path to the size, mtime and hash seen last time, so an unchanged file
+    is recognised from os.stat() alone; a touched or copied file is hashed and
+    still finds its entry. Loading an entry bumps its mtime, and the least
+    recently used entries are removed once the directory holds more than
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+
+    def _read_index(self) -> Dict[str, list]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest + _CACHE_SUFFIX)
+
+    def key(self, filename) -> str:
+        """Content hash of filename, taken from the index when size and mtime still match."""
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        known = self._read_index().get(path)
+        if known and known[:2] == [st.st_size, st.st_mtime_ns]:
+            return known[2]
+        digest = file_digest(path)
+        index = self._read_index()
+        index[path] = [st.st_size, st.st_mtime_ns, digest]
+        # Forget paths whose entries were evicted
+        index = {p: v for p, v in index.items() if v[2] == digest or os.path.exists(self._entry_path(v[2]))}
+        tmp_path = self.index_path + f'.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not update parse cache index: {e}")
+        return digest
+
+    def load(self, digest: str):
+        path = self._entry_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable parse cache entry {path}: {e}")
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+            return None
+        os.utime(path)
+        return entry
+
+    def store(self, digest: str, entry: Dict[str, object]):
+        path = self._entry_path(digest)
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 1))
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError as e:
+            print(f"Could not write parse cache entry: {e}")
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_CACHE_SUFFIX):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime_ns, st.st_size, name))
+        total = sum(size for _mtime, size, _name in entries)
+        for _mtime, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+def iter_vcards_with_cache(filename, cache: ParseCache, stats: Dict[str, int], jobs: int = 1,
+                           input_format: str = 'vcf'):
+    """iter_vcards() through the parse cache.
+
+    Plain cards are cached as their text and identity fields and come back as
+    LazyContact records, so neither a miss nor a hit tokenizes them; other
+    cards are cached with their properties. A hit repeats the parse errors of
+    the original run ('parsed_from_cache' counts the cards). An entry parsed
+    with another input_format or phone region is a miss. A miss parses the
+    file and stores the entry once the generator has been read to the end.
+    """
+    digest = cache.key(filename)
+    entry = cache.load(digest)
+    if entry is not None and (entry['input_format'], entry['phone_region']) != (input_format, _phone_region):
+        # Same bytes read as vcf and as jsonl give different cards; tels depend on the region
+        entry = None
+    if entry is not None:
+        for msg in entry['messages']:
+            print(msg)
+        stats['loaded'] += entry['loaded']
+        stats['malformed'] += entry['malformed']
+        stats['parsed_from_cache'] += entry['loaded']
+        for card in entry['cards']:
+            # (raw, fn, emails, tels) of a plain card, (props, raw) of any other
+            yield LazyContact.from_fields(*card) if len(card) == 4 else Contact(*card)
+        return
+    file_stats = Counter()
+    messages: List[str] = []
+    def report(msg):
+        messages.append(msg)
+        print(msg)
+    cards = []
+    for contact in iter_vcards(filename, file_stats, jobs, report, input_format):
+        if isinstance(contact, LazyContact):
+            cards.append((contact.raw, contact.fn, contact.emails, contact.tels))
+        else:
+            cards.append((contact.props, contact.raw))
+        yield contact
+    stats.update(file_stats)
+    cache.store(digest, {'version': CACHE_VERSION, 'input_format': input_format, 'phone_region': _phone_region,
+                         'cards': cards, 'messages': messages, 'loaded': file_stats['loaded'],
+                         'malformed': file_stats['malformed']})
+
+# --- Incremental state (--state) ---------------------------------------------
+
+STATE_VERSION = 2
+
+def card_digest(text: str) -> bytes:
+    """Content hash of one card's text, used to recognise unchanged cards."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def load_state(path: str, signature: tuple) -> Dict[str, object]:
+    """Load the state saved by a previous --state run.
+
+    'cards' maps card digests to how each card loads (see iter_vcards_cached)
+    and is reused whatever the options; 'groups' maps dedupe keys to their
+    member digests and rendered output, and 'input' describes the input file
+    of the run that saved them. Both are only reused when signature (the
+    options that affect grouping and output) matches. A missing or unreadable
+    file starts from an empty state.
+    """
+    state = {'version': STATE_VERSION, 'signature': signature, 'cards': {}, 'groups': {}, 'input': None}
+    if not os.path.exists(path):
+        return state
+    try:
+        with open(path, 'rb') as f:
+            previous = pickle.load(f)
+    except Exception as e:
+        print(f"Could not read state file {path}: {e}. Running a full merge.")
+        return state
+    if not isinstance(previous, dict) or previous.get('version') != STATE_VERSION:
+        print(f"State file {path} is from another version. Running a full merge.")
+        return state
+    state['cards'] = previous['cards']
+    if previous['signature'] == signature:
+        state['groups'] = previous['groups']
+        state['input'] = previous['input']
+    return state
+
+def save_state(path: str, state: Dict[str, object]):
+    # Write to a temporary file first so an interrupted run keeps the old state
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+_NOT_CACHED = object()
+
+def iter_vcards_cached(filename, state: Dict[str, object], stats: Dict[str, int], digests: Dict[int, bytes],
+                       report=print):
+    """Like iter_vcards, but cards unchanged since the last run are not parsed again.
+
+    Each card's text is hashed; known digests are rebuilt from state['cards']
+    (counted as 'parsed_cached'), others go through the normal loader. A
+    plain card is saved as True and comes back as a LazyContact of its text,
+    other cards keep their parsed properties, and parse errors are saved and
+    reported again so the output matches a full run. digests receives
+    id(contact) -> digest for every yielded card. When the generator is
+    exhausted state['cards'] holds only the cards seen in this run and
+    state['input'] what loading them counted and reported.
+    """
+    previous = state['cards']
+    current = {}
+    loaded, malformed = stats['loaded'], stats['malformed']
+    texts = 0
+    load_messages: List[str] = []
+    def report_load(msg):
+        load_messages.append(msg)
+        report(msg)
+    with open(filename, 'r', encoding='utf-8') as f:
+        for text in _split_card_texts(f, stats, report_load):
+            texts += 1
+            digest = card_digest(text)
+            entry = current.get(digest, previous.get(digest, _NOT_CACHED))
+            if entry is _NOT_CACHED:
+                messages: List[str] = []
+                def report_card(msg):
+                    messages.append(msg)
+                    report_load(msg)
+                contacts = list(_load_card_texts([text], stats, report_card))
+                # How the card loads: True (plain), props, the parse error, or None for a nameless card
+                if contacts:
+                    entry = True if isinstance(contacts[0], LazyContact) else contacts[0].props
+                else:
+                    entry = messages[0] if messages else None
+                current[digest] = entry
+                if contacts:
+                    digests[id(contacts[0])] = digest
+                    yield contacts[0]
+                continue
+            current[digest] = entry
+            stats['parsed_cached'] += 1
+            if entry is True or isinstance(entry, tuple):
+                contact = LazyContact(text) if entry is True else Contact(entry, text)
+                stats['loaded'] += 1
+                digests[id(contact)] = digest
+                yield contact
+            else:
+                if entry is not None:
+                    report_load(entry)
+                stats['malformed'] += 1
+    state['cards'] = current
+    state['input'] = {'messages': load_messages, 'cards': texts, 'loaded': stats['loaded'] - loaded,
+                      'malformed': stats['malformed'] - malformed}
+
+def merge_contacts_cached(contacts, digests: Dict[int, bytes], state: Dict[str, object], render,
+                          safe_merge: bool = False, merge_log: List[str] = None):
+    """merge_contacts() that reuses the output of groups unchanged since the last run.
+
+    A group is reused when the same dedupe key has exactly the same member
+    cards (by digest) as last time; other groups are merged and passed to
+    render(cards) -> str. Returns (chunks, merged_count, unique_count,
+    groups_merged) where chunks are the rendered groups in output order.
+    """
+    previous = state['groups']
+    current = {}
+    chunks: List[str] = []
+    merged_count = unique_count = groups_merged = 0
+    for key, group in contacts.items():
+        members = tuple(digests[id(c)] for c in group)
+        entry = previous.get(key)
+        if entry is None or entry[0] != members:
+            group_log: List[str] = []
+            merged, count = merge_contacts({key: group}, safe_merge, group_log)
+            entry = (members, render(merged), count, len(merged), group_log)
+            groups_merged += 1
+        current[key] = entry
+        chunks.append(entry[1])
+        merged_count += entry[2]
+        unique_count += entry[3]
+        if merge_log is not None:
+            merge_log.extend(entry[4])
+    state['groups'] = current
+    return chunks, merged_count, unique_count, groups_merged
+
+def reuse_state_groups(state: Dict[str, object], merge_log: List[str] = None):
+    """Output of the last run, for an input file unchanged since then.
+
+    Returns (chunks, merged_count, unique_count) like merge_contacts_cached.
+    """
+    chunks: List[str] = []
+    merged_count = unique_count = 0
+    for _members, rendered, count, unique, group_log in state['groups'].values():
+        chunks.append(rendered)
+        merged_count += count
+        unique_count += unique
+        if merge_log is not None:
+            merge_log.extend(group_log)
+    return chunks, merged_count, unique_count
+
+# --- Run metrics -----------------------------------------------------------------
+
+METRICS_VERSION = 1
+METRICS_STAGES = ('state', 'parse', 'group', 'stats', 'merge', 'write')
+_NEXT_DONE = object()
+
+class StageMetrics:
+    """Wall time, CPU time, card count and traced memory peak per pipeline stage.
+
+    Stages nest: while an inner stage runs (e.g. parsing pulled lazily by the
+    grouping loop through iterate()), its time is charged to the inner stage
+    only. Memory peaks are tracemalloc's traced bytes while the stage was
+    active and are only recorded when trace_memory is set. Without per_item,
+    iterate() hands the iterable back unwrapped, so lazily pulled stages are
+    charged to the stage pulling them instead of costing a switch per card.
+    """
+
+    def __init__(self, trace_memory: bool = False, per_item: bool = True):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.trace_memory = trace_memory
+        self.per_item = per_item
+        self._stack: List[str] = []
+        self._mark = (time.perf_counter(), time.process_time())
+        self._start = self._mark
+
+    def _switch(self):
+        now = (time.perf_counter(), time.process_time())
+        if self._stack:
+            stage = self.stages[self._stack[-1]]
+            stage['wall'] += now[0] - self._mark[0]
+            stage['cpu'] += now[1] - self._mark[1]
+            if self.trace_memory:
+                stage['peak'] = max(stage['peak'], tracemalloc.get_traced_memory()[1])
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._mark = now
+
+    def enter(self, name: str):
+        self._switch()
+        self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'cards': 0, 'peak': 0})
+        self._stack.append(name)
+
+    def leave(self):
+        self._switch()
+        self._stack.pop()
+
+    def count(self, name: str, cards: int):
+        self.stages[name]['cards'] += cards
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.leave()
+
+    def iterate(self, name: str, iterable):
+        """Iterate iterable, charging the time spent producing each item to stage name."""
+        if not self.per_item:
+            return iterable
+        return self._iterate(name, iterable)
+
+    def _iterate(self, name: str, iterable):
+        it = iter(iterable)
+        while True:
+            self.enter(name)
+            try:
+                item = next(it, _NEXT_DONE)
+            finally:
+                self.leave()
+            if item is _NEXT_DONE:
+                return
+            self.stages[name]['cards'] += 1
+            yield item
+
+    def ordered(self) -> List[tuple]:
+        """(name, figures) pairs in pipeline order."""
+        rank = {name: i for i, name in enumerate(METRICS_STAGES)}
+        return sorted(self.stages.items(), key=lambda item: rank.get(item[0], len(rank)))
+
+    def totals(self) -> tuple:
+        return time.perf_counter() - self._start[0], time.process_time() - self._start[1]
+
+    def print_summary(self):
+        wall, cpu = self.totals()
+        print(f"{'Stage':<8} {'Wall s':>9} {'CPU s':>9} {'Cards':>10} {'Peak MB':>9}")
+        for name, stage in self.ordered():
+            peak = f"{stage['peak'] / (1 << 20):>9.1f}" if self.trace_memory else f"{'-':>9}"
+            print(f"{name:<8} {stage['wall']:>9.3f} {stage['cpu']:>9.3f} {stage['cards']:>10} {peak}")
+        print(f"{'total':<8} {wall:>9.3f} {cpu:>9.3f}")
+
+    def to_dict(self) -> Dict[str, object]:
+        wall, cpu = self.totals()
+        return {
+            'version': METRICS_VERSION,
+            'stages': {name: {'wall_seconds': round(s['wall'], 6), 'cpu_seconds': round(s['cpu'], 6),
+                              'cards': s['cards'], 'peak_traced_bytes': s['peak'] if self.trace_memory else None}
+                       for name, s in self.ordered()},
+            'total': {'wall_seconds': round(wall, 6), 'cpu_seconds': round(cpu, 6)},
+        }
+
+def write_metrics(metrics: StageMetrics, path: str, extra: Dict[str, object]):
+    data = metrics.to_dict()
+    data.update(extra)
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        print(f"Metrics written to {path}")
+    except OSError as e:
+        print(f"Failed to write metrics: {e}")
+
+def print_load_summary(load_stats: Dict[str, int]):
+    print(f"Loaded {load_stats['loaded']} valid vCards. Skipped {load_stats['malformed']} malformed or missing-name cards.")
+    print(f"Parser: {load_stats['parsed_native']} cards via native tokenizer, "
+          f"{load_stats['parsed_vobject']} via vobject fallback.")
+    if load_stats['parsed_cached']:
+        print(f"State: {load_stats['parsed_cached']} unchanged cards reused without parsing.")
+    if load_stats['parsed_from_cache']:
+        print(f"Cache: {load_stats['parsed_from_cache']} cards loaded from the parse cache without parsing.")
+
 def write_merge_log(log_lines: List[str], output_file: str):
     if not log_lines:
         return
@@ -197,7 +2060,7 @@ def write_merge_log(log_lines: List[str], output_file: str):
     except Exception as e:
         print(f"Failed to write merge log: {e}")
 
-def parse_args():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Merge duplicate vCards with configurable strategies.")
     parser.add_argument('-i', '--input', help='Input .vcf file (skip GUI if provided)')
     parser.add_argument('-o', '--output', help='Output file (extension inferred if --format given)')
@@ -206,12 +2069,40 @@ def parse_args():
     parser.add_argument('--no-merge', action='store_true', help='Disable merging (just re-save filtered valid cards).')
     parser.add_argument('--log', action='store_true', help='Write a merge decision log alongside output file.')
     parser.add_argument('--no-gui', action='store_true', help='Fail instead of prompting with GUI dialogs if input/output missing.')
-    parser.add_argument('--format', choices=['vcf','csv'], default='vcf', help='Output format: vcf (default) or csv.')
+    parser.add_argument('--format', choices=['vcf','csv','jsonl'], default='vcf', help='Output format: vcf (default), csv or jsonl (one JSON object per card).')
+    parser.add_argument('--shards', type=int, metavar='N', help='Write the merged output as N files (merged.00.vcf, ...) partitioned by a hash of the dedupe key, written concurrently, plus a merged.manifest.json with per-shard counts and SHA-256 checksums.')
+    parser.add_argument('--input-format', choices=['vcf','jsonl'], default='vcf', help='Input format: vcf (default) or jsonl as written by --format jsonl.')
     parser.add_argument('--csv-fields', default='FN,EMAIL,TEL,ORG,TITLE', help='Comma-separated fields for CSV columns (default: FN,EMAIL,TEL,ORG,TITLE). Repeated multivalue fields joined by ;')
     parser.add_argument('--interactive', action='store_true', help='Force interactive prompts for merge parameters.')
     parser.add_argument('--no-interactive', action='store_true', help='Disable interactive prompts even if no parameters supplied.')
     parser.add_argument('--console', action='store_true', help='Force console path prompts instead of GUI file dialogs.')
-    return parser.parse_args()
+    parser.add_argument('--cluster', metavar='FIELDS', help='Also join duplicate groups transitively through shared values of these fields (EMAIL, TEL). Example: email,tel')
+    parser.add_argument('--fuzzy', type=float, metavar='THRESHOLD', help='Also join cards whose names are similar (0-1, e.g. 0.85). Handles "Smith, John" vs "John Smith" and typos.')
+    parser.add_argument('--fuzzy-blocking', default='phonetic,minhash', help='Candidate blocking for --fuzzy: phonetic, minhash or both (default: phonetic,minhash).')
+    parser.add_argument('--fuzzy-max-block', type=int, default=1000, help='Skip fuzzy blocks with more names than this (default: 1000).')
+    parser.add_argument('--serve', metavar='ADDRESS', help='Run as a daemon: load the input once and answer query/insert/export requests on unix:PATH or localhost:PORT (HTTP) until interrupted. Export writes the -o file.')
+    parser.add_argument('--watch', metavar='DIR', help='Keep the output merged from every .vcf file (.jsonl with --input-format jsonl) in this directory: new and changed files are parsed and folded in, and the output is rewritten once per burst of changes. Runs until interrupted.')
+    parser.add_argument('--watch-interval', type=float, default=2.0, metavar='SECONDS', help='Polling interval of --watch; changes are applied after one quiet interval (default: 2)')
+    parser.add_argument('--stats-only', action='store_true', help='Only report duplicate statistics (group counts, group sizes, what --safe-merge would skip); nothing is merged or written.')
+    parser.add_argument('--stats-json', metavar='PATH', help='Also write the --stats-only statistics to a JSON file (implies --stats-only).')
+    parser.add_argument('--phone-region', metavar='CC', help='Compare phone numbers in E.164 form, reading numbers without a country code as local to this country (e.g. US, GB, DE).')
+    parser.add_argument('--jobs', type=int, default=1, help='Parse the input and merge duplicate groups with N worker processes (default: 1; 0 = one per CPU).')
+    parser.add_argument('--store', metavar='sqlite:PATH', help='Group cards in an on-disk SQLite database instead of memory, for inputs larger than RAM. Example: sqlite:/tmp/contacts.db')
+    parser.add_argument('--keep-store', action='store_true', help='Keep the --store database after the run (deleted by default).')
+    parser.add_argument('--spill-dir', metavar='DIR', help='Group duplicates with an external sort through temporary files in DIR, keeping memory bounded (dedupe key only; not with --cluster/--fuzzy).')
+    parser.add_argument('--spill-run-size', type=int, default=1000000, help='Records per sorted run in --spill-dir mode (default: 1000000).')
+    parser.add_argument('--state', metavar='FILE', help='Keep parsed cards and merged groups in FILE between runs; later runs only parse changed cards and re-merge affected groups.')
+    parser.add_argument('--cache-dir', metavar='DIR', default=os.environ.get(CACHE_ENV) or None, help=f'Cache parsed cards in DIR and reuse them while the input file is unchanged (default: ${CACHE_ENV} if set). Not used with --state, --store or --spill-dir.')
+    parser.add_argument('--cache-size', type=int, default=1024, metavar='MB', help='Evict least recently used parse cache entries beyond this size (default: 1024).')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the parse cache for this run.')
+    parser.add_argument('--metrics', action='store_true', help='Print wall time, CPU time and card count per stage (state, parse, group, merge, write).')
+    parser.add_argument('--metrics-json', metavar='PATH', help='Also write the --metrics stage figures to PATH as JSON (implies --metrics).')
+    parser.add_argument('--trace-memory', action='store_true', help='Add the tracemalloc peak per stage to --metrics (implies --metrics; parsing runs several times slower while tracing).')
+    parser.add_argument('--profile', metavar='PATH', help='Write a cProfile dump of the run to PATH (view with python -m pstats PATH).')
+    return parser
+
+def parse_args(argv: List[str] = None):
+    return build_parser().parse_args(argv)
 
 def _prompt(prompt: str, default: str = None, validator=None):
     while True:
@@ -250,10 +2141,10 @@ def interactive_config(args):
     # Output format
     def fmt_validator(v):
         v2 = v.lower()
-        if v2 in ('vcf','csv'):
+        if v2 in ('vcf','csv','jsonl'):
             return True, '', v2
-        return False, 'Format must be vcf or csv', None
-    chosen_format = _prompt('Output format (vcf/csv)', args.format, fmt_validator)
+        return False, 'Format must be vcf, csv or jsonl', None
+    chosen_format = _prompt('Output format (vcf/csv/jsonl)', args.format, fmt_validator)
 
     # Dedupe key
     dedupe_key = _prompt('Duplicate key fields (comma separated)', args.dedupe_key)
@@ -298,70 +2189,1142 @@ def interactive_config(args):
     print("==========================================\n")
     return args
 
-# Save merged vCards to a file
+# --- vCard output ---------------------------------------------------------------
+
+_TEXT_ESCAPES = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n'})
+_PARAM_SPECIALS = re.compile(r'[,;:]')
+_FOLD_AT = 75
+_WRITE_BUFFER = 1 << 20
+
+def _escape_text(value: str) -> str:
+    return _canonical_value(value).translate(_TEXT_ESCAPES)
+
+def _fold_line(line: str) -> str:
+    """Fold a content line at 75 octets (without splitting UTF-8 sequences) and end it."""
+    if len(line) <= _FOLD_AT and (line.isascii() or len(line.encode('utf-8')) <= _FOLD_AT):
+        return line + '\n'
+    parts = []
+    part_start = 0
+    size = 0
+    limit = _FOLD_AT
+    for i, ch in enumerate(line):
+        width = 1 if ch < '\x80' else len(ch.encode('utf-8'))
+        if size + width > limit:
+            parts.append(line[part_start:i])
+            part_start = i
+            size = 0
+            limit = _FOLD_AT - 1  # continuation lines start with a space
+        size += width
+    parts.append(line[part_start:])
+    return '\n '.join(parts) + '\n'
+
+def serialize_property(prop: tuple) -> str:
+    """Serialize a (group, name, params, value) property as a folded vCard 3.0 line.
+
+    Values are encoded the way vobject encodes them (text escaping, structured
+    N/ADR/ORG fields, comma-joined lists, base64 for binary values) without
+    building a ContentLine.
+    Params are written in their original order; PHOTO lines are not folded,
+    matching vobject. Lines end in a bare LF; writers convert to CRLF.
+    """
+    group, name, params, value = prop
+    line = f"{group}.{name}" if group else name
+    for key, *vals in params:
+        if vals:
+            line += ';' + key + '=' + ','.join(f'"{v}"' if _PARAM_SPECIALS.search(v) else v for v in vals)
+        else:
+            line += ';' + key
+    if isinstance(value, bytes):
+        value = base64.b64encode(value).decode('ascii')
+    elif name in _RAW_VALUE_PROPS:
+        value = str(value)
+    elif name in _STRUCTURED_PROPS and isinstance(value, tuple):
+        value = ';'.join(_escape_text(field) if isinstance(field, str)
+                         else ','.join(_escape_text(v) for v in field)
+                         for field in value)
+    elif isinstance(value, tuple):
+        # Multi-valued text such as CATEGORIES
+        value = ','.join(_escape_text(v) for v in value)
+    elif isinstance(value, str):
+        value = _escape_text(value)
+    else:
+        value = str(value)
+    line += ':' + value
+    if name == 'PHOTO':
+        return line + '\n'
+    return _fold_line(line)
+
+def format_vcard(contact) -> str:
+    """Output text of one card, with LF line endings (see save_vcards).
+
+    A card the merge left untouched is its original text; a merged card is the
+    base card's text with the added properties inserted before END:VCARD.
+    """
+    raw = contact.raw
+    if '\r' in raw:
+        raw = raw.replace('\r\n', '\n').replace('\r', '\n')
+    if not raw.endswith('\n'):
+        raw += '\n'
+    if not contact.added:
+        return raw
+    head, _, end_line = raw[:-1].rpartition('\n')
+    return head + '\n' + ''.join(serialize_property(prop) for prop in contact.added) + end_line + '\n'
+
 def save_vcards(vcards, filename):
-    with open(filename, 'w', encoding='utf-8') as f:
-        for card in vcards:
-            f.write(card.serialize())
-
-def extract_property_values(card, prop_name: str) -> List[str]:
-    prop_name = prop_name.upper()
-    values = []
-    for child in card.getChildren():
-        if child.name == prop_name:
-            val = getattr(child, 'value', '')
-            if isinstance(val, str):
-                values.append(val.strip())
-            else:
-                try:
-                    values.append(str(val))
-                except Exception:
-                    pass
-    return values
-
-def card_to_csv_row(card, field_order: List[str]) -> List[str]:
-    row = []
-    fn_val = getattr(card, 'fn', None)
-    for field in field_order:
-        f_upper = field.upper()
-        if f_upper == 'FN':
-            row.append(fn_val.value.strip() if fn_val else '')
-        elif f_upper == 'N':
-            # Structured name; join components with space
-            n_obj = getattr(card, 'n', None)
-            if n_obj and hasattr(n_obj, 'value'):
-                try:
-                    parts = [p for p in n_obj.value if p]
-                    row.append(' '.join(parts))
-                except Exception:
-                    row.append(str(n_obj.value))
-            else:
-                row.append('')
+    """Write cards as format_vcard text with CRLF line endings.
+
+    Text is collected into ~1 MB blocks that are encoded and converted to CRLF
+    in one step each, so untouched cards cost little more than copying their
+    bytes.
+    """
+    with open(filename, 'wb') as f:
+        buf: List[str] = []
+        size = 0
+        for contact in vcards:
+            text = contact.raw
+            if contact.added or '\r' in text or not text.endswith('\n'):
+                text = format_vcard(contact)
+            buf.append(text)
+            size += len(text)
+            if size >= _WRITE_BUFFER:
+                f.write(''.join(buf).encode('utf-8').replace(b'\n', b'\r\n'))
+                buf.clear()
+                size = 0
+        f.write(''.join(buf).encode('utf-8').replace(b'\n', b'\r\n'))
+
+def group_renderer(args):
+    """render(cards) -> str in the output format of args, for save_rendered()."""
+    if args.format == 'csv':
+        csv_fields = [f.strip() for f in args.csv_fields.split(',')]
+        return lambda cards: render_csv_rows(cards, csv_fields)
+    if args.format == 'jsonl':
+        return render_jsonl
+    return render_vcards
+
+def render_vcards(vcards) -> str:
+    return ''.join(format_vcard(contact) for contact in vcards).replace('\n', '\r\n')
+
+def render_csv_rows(vcards, fields: List[str]) -> str:
+    row = compile_row_function([f.strip() for f in fields if f.strip()])
+    buf = io.StringIO()
+    csv.writer(buf).writerows(map(row, vcards))
+    return buf.getvalue()
+
+def _thaw(value):
+    """Inverse of _freeze: tuples back to lists, as vobject holds them."""
+    return [_thaw(v) if isinstance(v, tuple) else v for v in value] if isinstance(value, tuple) else value
+
+def _field_text(field, sep: str) -> str:
+    return sep.join(field) if isinstance(field, tuple) else field
+
+def _display_value(name: str, value) -> str:
+    """str() of the value vobject would hold for a property.
+
+    N and ADR follow vobject's Name.__str__ and Address.__str__ on the
+    NAME_ORDER/ADDRESS_ORDER field tuples; other lists print as Python lists.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, tuple) and name == 'N':
+        family, given, additional, prefix, suffix = value
+        return ' '.join(_field_text(f, ' ') for f in (prefix, given, additional, family, suffix))
+    if isinstance(value, tuple) and name == 'ADR':
+        box, extended, street, city, region, code, country = value
+        text = '\n'.join(_field_text(f, '\n') for f in (box, extended, street) if f)
+        text += f"\n{_field_text(city, ' ')}, {_field_text(region, ' ')} {_field_text(code, ' ')}"
+        if country:
+            text += '\n' + _field_text(country, '\n')
+        return text
+    if isinstance(value, tuple):
+        return str(_thaw(value))
+    return str(value)
+
+def _join_cell(vals: List[str]) -> str:
+    # Multivalue cells: ';'-joined, duplicates removed in order of appearance
+    return vals[0] if len(vals) == 1 else ';'.join(dict.fromkeys(vals))
+
+def _text_cell(column: str, found: list, contact) -> str:
+    return _join_cell([v.strip() if isinstance(v, str) else _display_value(column, v) for v in found])
+
+def _tel_cell(column: str, found: list, contact) -> str:
+    # contact.tels already holds the digits of each text TEL value, in order
+    tels = iter(contact.tels)
+    vals = []
+    for v in found:
+        if isinstance(v, str):
+            digits = next(tels)
+            vals.append(digits if digits.isdigit() else v.strip())
         else:
-            vals = extract_property_values(card, f_upper)
-            if f_upper == 'TEL':
-                # Normalize phone digits for consistency but keep original display if needed
-                normed = []
-                for v in vals:
-                    digits = ''.join(ch for ch in v if ch.isdigit())
-                    normed.append(digits or v)
-                vals = normed
-            row.append(';'.join(dict.fromkeys(vals)))  # preserve order remove dup
+            vals.append(_display_value(column, v))
+    return _join_cell(vals)
+
+def _name_cell(column: str, found: list, contact) -> str:
+    return _display_value('N', found[0])
+
+def compile_row_function(fields: List[str]):
+    """Compile CSV columns into a function Contact -> row.
+
+    Produces the same cells as reading each column from the card's vobject
+    tree, but reads Contact.props in a single pass however many columns there
+    are.
+    """
+    columns = [f.upper() for f in fields]
+    wanted = frozenset(c for c in columns if c != 'FN')
+    cell_functions = [None if c == 'FN' else _tel_cell if c == 'TEL' else _name_cell if c == 'N' else _text_cell
+                      for c in columns]
+    plan = tuple(zip(columns, cell_functions))
+
+    def row(contact) -> List[str]:
+        values: Dict[str, list] = {}
+        for prop in contact.props:
+            name = prop[1]
+            if name in wanted:
+                found = values.get(name)
+                if found is None:
+                    values[name] = [prop[3]]
+                else:
+                    found.append(prop[3])
+        cells = []
+        for column, cell in plan:
+            if cell is None:
+                cells.append(contact.fn)
+                continue
+            found = values.get(column)
+            if not found:
+                cells.append('')
+            elif cell is _text_cell and len(found) == 1 and isinstance(found[0], str):
+                cells.append(found[0].strip())
+            else:
+                cells.append(cell(column, found, contact))
+        return cells
     return row
 
-def save_csv(vcards, filename, fields: List[str]):
+# Rows handed to csv.writer.writerows at a time
+_CSV_BATCH = 1000
+
+def save_csv(vcards, filename, fields: List[str], report=print):
+    """Write cards (any iterable, e.g. a streaming loader) as CSV rows in batches."""
     # Ensure extension
     if not filename.lower().endswith('.csv'):
         filename += '.csv'
     fields_clean = [f.strip() for f in fields if f.strip()]
+    row = compile_row_function(fields_clean)
+    rows = map(row, vcards)
     with open(filename, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(fields_clean)
+        while True:
+            batch = list(itertools.islice(rows, _CSV_BATCH))
+            if not batch:
+                break
+            writer.writerows(batch)
+    report(f"CSV saved to {filename}")
+
+def save_rendered(chunks: List[str], filename, csv_fields: List[str] = None):
+    """Write output pre-rendered by render_vcards/render_csv_rows (--state runs)."""
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        if csv_fields:
+            csv.writer(f).writerow([c.strip() for c in csv_fields if c.strip()])
+        f.writelines(chunks)
+
+# --- JSON Lines (--format jsonl, --input-format jsonl) ----------------------------
+# One JSON object per line and per card: {"fn": ..., "emails": [...], "tels": [...],
+# "vcard": ...}. emails/tels are the distinct normalized values used for matching;
+# vcard is the card's output text (LF line endings), which is all the reader needs.
+
+_json_string = json.encoder.encode_basestring
+
+def format_jsonl(contact) -> str:
+    """JSON Lines record of one card, built directly rather than through json.dumps()."""
+    emails = ','.join(map(_json_string, dict.fromkeys(contact.emails)))
+    tels = ','.join(map(_json_string, dict.fromkeys(contact.tels)))
+    vcard = _json_string(format_vcard(contact))
+    return f'{{"fn":{_json_string(contact.fn)},"emails":[{emails}],"tels":[{tels}],"vcard":{vcard}}}\n'
+
+def save_jsonl(vcards, filename):
+    """Write cards (any iterable) as JSON Lines, in ~1 MB blocks like save_vcards."""
+    with open(filename, 'wb') as f:
+        buf: List[str] = []
+        size = 0
+        for contact in vcards:
+            line = format_jsonl(contact)
+            buf.append(line)
+            size += len(line)
+            if size >= _WRITE_BUFFER:
+                f.write(''.join(buf).encode('utf-8'))
+                buf.clear()
+                size = 0
+        f.write(''.join(buf).encode('utf-8'))
+
+def render_jsonl(vcards) -> str:
+    return ''.join(map(format_jsonl, vcards))
+
+def iter_jsonl_cards(filename, stats: Dict[str, int], report=print):
+    """Stream cards from a JSON Lines file whose records carry a 'vcard' text.
+
+    Each record's text is split and parsed like a small .vcf file, so the
+    output of save_jsonl() (or any records with a 'vcard' string) reads back
+    as the same cards. Blank lines are skipped; any other line that is not a
+    JSON object with a 'vcard' string is reported and counted as malformed.
+    """
+    def card_texts():
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                text = record.get('vcard') if isinstance(record, dict) else None
+                if not isinstance(text, str):
+                    report(f"Parse error: line {line_no} is not a JSON object with a 'vcard' string. It will be skipped.")
+                    stats['malformed'] += 1
+                    continue
+                yield from _split_card_texts(io.StringIO(text, newline=None), stats, report)
+
+    yield from _load_card_texts(card_texts(), stats, report)
+
+# --- Sharded output (--shards) ----------------------------------------------------
+# Groups are partitioned by a stable hash of their dedupe key, so every card of a
+# merged group lands in the same shard and a key always maps to the same shard
+# number. Each shard is merged and written by its own worker thread.
+
+MANIFEST_VERSION = 1
+
+def shard_of(key: str, shards: int) -> int:
+    """Shard number of a duplicate group: CRC-32 of its key, stable across runs and machines."""
+    return zlib.crc32(key.encode('utf-8')) % shards
+
+def shard_paths(output_file: str, shards: int, fmt: str = 'vcf') -> tuple:
+    """([shard file per shard], manifest path): merged.vcf -> merged.00.vcf, ... and merged.manifest.json.
+
+    The extension is set to fmt first, so the shard files are named exactly as
+    the writers save them.
+    """
+    root, ext = os.path.splitext(output_path(output_file, fmt))
+    width = max(2, len(str(shards - 1)))
+    return [f"{root}.{i:0{width}d}{ext}" for i in range(shards)], root + '.manifest.json'
+
+def partition_groups(groups, shards: int) -> List[Dict[str, List]]:
+    """Split a {key: group} dict into one such dict per shard, keeping group order."""
+    parts: List[Dict[str, List]] = [{} for _ in range(shards)]
+    for key, group in groups.items():
+        parts[shard_of(key, shards)][key] = group
+    return parts
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_WRITE_BUFFER), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_shard(number: int, groups: Dict[str, List], path: str, args, merge_log: List[str] = None):
+    merged, merged_count = merge_contacts(groups, safe_merge=args.safe_merge, merge_log=merge_log)
+    if args.format == 'csv':
+        save_csv(merged, path, [f.strip() for f in args.csv_fields.split(',')], report=lambda message: None)
+    elif args.format == 'jsonl':
+        save_jsonl(merged, path)
+    else:
+        save_vcards(merged, path)
+    return {'shard': number, 'file': os.path.basename(path), 'groups': len(groups), 'contacts': len(merged),
+            'duplicates_merged': merged_count, 'bytes': os.path.getsize(path), 'sha256': _file_sha256(path)}
+
+def write_shards(groups, output_file: str, args, input_file: str = None,
+                 merge_log: List[str] = None) -> Dict[str, object]:
+    """Merge groups into args.shards output files written concurrently, plus a JSON manifest.
+
+    Returns the manifest: totals and, per shard, its file name, groups,
+    contacts, duplicates merged, size and SHA-256.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    paths, manifest_path = shard_paths(output_file, args.shards, args.format)
+    parts = partition_groups(groups, args.shards)
+    logs = [[] if merge_log is not None else None for _ in parts]
+    with ThreadPoolExecutor(max_workers=min(args.shards, 32)) as pool:
+        files = list(pool.map(_write_shard, range(args.shards), parts, paths, itertools.repeat(args), logs))
+    if merge_log is not None:
+        # merge_contacts logs one line per group of two or more cards, so each line's
+        # group is known; put the lines back in the order of an unsharded run
+        order = {key: i for i, key in enumerate(groups)}
+        numbered = ([(order[key], line) for key, line
+                     in zip((key for key, group in part.items() if len(group) > 1), shard_log)]
+                    for part, shard_log in zip(parts, logs))
+        merge_log += [line for _i, line in heapq.merge(*numbered)]
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'input': input_file,
+        'format': args.format,
+        'dedupe_key': [p.strip() for p in args.dedupe_key.split(',') if p.strip()],
+        'shards': args.shards,
+        'partition': 'crc32(utf-8 group key) % shards',
+        'contacts': sum(f['contacts'] for f in files),
+        'duplicates_merged': sum(f['duplicates_merged'] for f in files),
+        'files': files,
+    }
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, manifest_path)
+    manifest['manifest'] = manifest_path
+    return manifest
+
+# --- Library API ---------------------------------------------------------------
+
+# Options that only steer the command-line front end (paths, prompts, dialogs)
+_CLI_ONLY_OPTIONS = frozenset(('input', 'output', 'no_gui', 'interactive', 'no_interactive', 'console', 'serve',
+                               'watch', 'watch_interval'))
+# Comma-separated options that merge() also accepts as lists
+_LIST_OPTIONS = frozenset(('dedupe_key', 'csv_fields', 'cluster', 'fuzzy_blocking'))
+
+def output_path(output_file: str, fmt: str) -> str:
+    """output_file with the extension of output format fmt: added if missing, replaced if different."""
+    extension = '.' + fmt
+    if '.' not in os.path.basename(output_file):
+        return output_file + extension
+    if not output_file.lower().endswith(extension):
+        return os.path.splitext(output_file)[0] + extension
+    return output_file
+
+def merge_options(options: Dict[str, object] = None) -> argparse.Namespace:
+    """Command-line defaults overridden by options, keyed by long flag name with '_' for '-'."""
+    args = parse_args([])
+    for key, value in (options or {}).items():
+        if key in _CLI_ONLY_OPTIONS or not hasattr(args, key):
+            raise ValueError(f"Unknown merge option '{key}'")
+        if key in _LIST_OPTIONS and isinstance(value, (list, tuple)):
+            value = ','.join(value)
+        setattr(args, key, value)
+    return args
+
+def merge(input_file, output_file, options: Dict[str, object] = None) -> Dict[str, object]:
+    """Merge duplicate cards of input_file into output_file and return run statistics.
+
+    options: command-line options by long name, e.g. {'dedupe_key': ['FN', 'EMAIL'],
+    'safe_merge': True, 'format': 'csv'}; anything not given takes the CLI default.
+    Raises ValueError for unknown or conflicting options. Progress is printed
+    as on the command line. See run_merge() for the returned statistics. The
+    extension of output_file is adjusted to the format as on the command line.
+    """
+    args = merge_options(options)
+    return run_merge(args, input_file, output_path(output_file, args.format))
+
+def _check_options(args):
+    if args.jobs < 0:
+        raise ValueError("--jobs must be at least 1, or 0 for one per CPU")
+    if args.cache_size < 0:
+        raise ValueError("--cache-size must not be negative")
+    if args.input_format == 'jsonl' and (args.jobs != 1 or args.state or (args.spill_dir and not args.no_merge)):
+        raise ValueError("--input-format jsonl cannot be combined with --jobs, --state or --spill-dir")
+    if args.stats_json:
+        args.stats_only = True
+    if args.stats_only and (args.no_merge or args.state):
+        raise ValueError("--stats-only cannot be combined with --no-merge or --state")
+    if args.shards is not None:
+        if args.shards < 1:
+            raise ValueError("--shards must be at least 1")
+        if args.no_merge or args.stats_only or args.state or args.store or args.spill_dir or args.serve or args.watch:
+            raise ValueError("--shards cannot be combined with --no-merge, --stats-only, --state, --store, "
+                             "--spill-dir, --serve or --watch")
+    if args.no_merge:
+        return
+    if args.spill_dir:
+        if args.cluster or args.fuzzy is not None or args.store or args.state:
+            raise ValueError("--spill-dir cannot be combined with --cluster, --fuzzy, --store or --state")
+        if args.spill_run_size < 1:
+            raise ValueError("--spill-run-size must be at least 1")
+    if args.store and args.state:
+        raise ValueError("--store and --state cannot be combined")
+
+def run_merge(args, input_file, output_file) -> Dict[str, object]:
+    """Run the load/group/merge/write pipeline for parsed command-line args.
+
+    Returns a dict with original_contacts, unique_contacts, duplicates_merged,
+    malformed, output, load_stats (parser counters) and metrics (per-stage
+    figures, see StageMetrics.to_dict()); with --shards also shards (the
+    manifest written by write_shards()).
+    """
+    _check_options(args)
+    set_phone_region(args.phone_region)
+    normalized_before = normalization_stats()
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    show_metrics = args.metrics or args.trace_memory or bool(args.metrics_json)
+    if args.trace_memory:
+        tracemalloc.start()
+    # Timing every card costs a few percent, so only do it when someone looks at the figures
+    metrics = StageMetrics(args.trace_memory, per_item=show_metrics or bool(args.profile))
+
+    store = None
+    if args.store and not args.no_merge:
+        try:
+            store = SQLiteStore.from_spec(args.store, keep=args.keep_store)
+        except sqlite3.Error as e:
+            raise ValueError(str(e)) from e
+    cache = None
+    # --state keeps its own per-card cache; --store/--spill-dir must not hold every card in memory
+    if args.cache_dir and not args.no_cache and not args.state and (args.no_merge or not (store or args.spill_dir)):
+        try:
+            cache = ParseCache(args.cache_dir, args.cache_size << 20)
+        except OSError as e:
+            print(f"Parse cache disabled: {e}")
+    try:
+        print(f"Loading vCards from {input_file}...")
+        load_stats = Counter()
+        state = None
+        if args.state:
+            # Options that change grouping or rendering invalidate the saved groups
+            signature = (args.dedupe_key, args.cluster, args.fuzzy, args.fuzzy_blocking, args.fuzzy_max_block,
+                         args.safe_merge, args.format, args.csv_fields if args.format == 'csv' else None,
+                         args.phone_region)
+            with metrics.stage('state'):
+                state = load_state(args.state, signature)
+                input_digest = _file_sha256(input_file)
+            previous_input = state['input']
+            # --no-merge streams the cards, so it always reads them
+            state_unchanged = (not args.no_merge and previous_input is not None
+                               and previous_input['sha256'] == input_digest)
+            if state_unchanged:
+                # Same bytes and options as the saved run: replay its loading messages, reuse its output
+                print(f"State: {input_file} is unchanged since the last run; reusing its output.")
+                for msg in previous_input['messages']:
+                    print(msg)
+                load_stats.update(loaded=previous_input['loaded'], malformed=previous_input['malformed'],
+                                  parsed_cached=previous_input['cards'])
+                vcards = iter(())
+            else:
+                digests: Dict[int, bytes] = {}
+                vcards = metrics.iterate('parse', iter_vcards_cached(input_file, state, load_stats, digests))
+        elif cache is not None:
+            vcards = metrics.iterate('parse', iter_vcards_with_cache(input_file, cache, load_stats, jobs=args.jobs,
+                                                                     input_format=args.input_format))
+        else:
+            vcards = metrics.iterate('parse', iter_vcards(input_file, load_stats, jobs=args.jobs,
+                                                          input_format=args.input_format))
+
+        merge_log: List[str] = [] if args.log and not args.stats_only else None
+        merge_counts = None
+        dup_stats = None
+        manifest = None
+        if args.no_merge:
+            # Stream cards straight from the loader to the writer
+            merged = vcards
+            merged_count = 0
+            if merge_log is not None:
+                merge_log.append("Merging disabled (--no-merge)")
+        else:
+            key_fields = [p.strip() for p in args.dedupe_key.split(',') if p.strip()]
+            with metrics.stage('group'):
+                if state is not None and state_unchanged:
+                    contacts = state['groups']
+                elif args.spill_dir:
+                    try:
+                        contacts = spill_duplicates(input_file, key_fields, load_stats, args.spill_dir,
+                                                    run_size=args.spill_run_size)
+                    except OSError as e:
+                        raise ValueError(f"Spill directory error: {e}") from e
+                elif store is not None:
+                    contacts = store_duplicates(vcards, store, key_fields, (args.cluster or '').split(','),
+                                                fuzzy_threshold=args.fuzzy,
+                                                fuzzy_blocking=args.fuzzy_blocking.split(','),
+                                                fuzzy_max_block=args.fuzzy_max_block)
+                elif args.cluster or args.fuzzy is not None:
+                    contacts = cluster_duplicates(vcards, key_fields, (args.cluster or '').split(','),
+                                                  fuzzy_threshold=args.fuzzy,
+                                                  fuzzy_blocking=args.fuzzy_blocking.split(','),
+                                                  fuzzy_max_block=args.fuzzy_max_block)
+                else:
+                    contacts = find_duplicates(vcards, key_fields)
+            metrics.count('group', load_stats['loaded'])
+            print_load_summary(load_stats)
+            if args.stats_only:
+                with metrics.stage('stats'):
+                    dup_stats = duplicate_stats(contacts.items() if isinstance(contacts, dict) else contacts)
+                metrics.count('stats', dup_stats['cards'])
+                merged_count = dup_stats['safe_merge']['duplicates'] if args.safe_merge else dup_stats['duplicates']
+                unique_count = dup_stats['cards'] - merged_count
+            elif state is not None:
+                render = group_renderer(args)
+                with metrics.stage('merge'):
+                    if state_unchanged:
+                        chunks, merged_count, unique_count = reuse_state_groups(state, merge_log)
+                        groups_merged = 0
+                    else:
+                        chunks, merged_count, unique_count, groups_merged = merge_contacts_cached(
+                            contacts, digests, state, render, safe_merge=args.safe_merge, merge_log=merge_log)
+                metrics.count('merge', unique_count)
+                print(f"State: {groups_merged} of {len(contacts)} groups merged again, the rest reused.")
+            elif store is not None or args.spill_dir:
+                # Groups stream from the store/spill runs through the merge into the writer
+                merge_counts = Counter()
+                merged = metrics.iterate('merge', merge_group_stream(contacts, merge_counts,
+                                                                     safe_merge=args.safe_merge,
+                                                                     merge_log=merge_log))
+            elif args.shards:
+                # Each shard is merged by its writer
+                merged = contacts
+            else:
+                with metrics.stage('merge'):
+                    merged, merged_count = merge_contacts(contacts, safe_merge=args.safe_merge,
+                                                          merge_log=merge_log, jobs=args.jobs)
+                unique_count = len(merged)
+                metrics.count('merge', unique_count)
+
+        if dup_stats is not None:
+            print_duplicate_stats(dup_stats, key_fields)
+            if args.stats_json:
+                write_stats_json(dup_stats, args.stats_json, input_file, key_fields, args)
+        else:
+            with metrics.stage('write'):
+                if state is not None and not args.no_merge:
+                    if args.format == 'csv':
+                        save_rendered(chunks, output_file, [f.strip() for f in args.csv_fields.split(',')])
+                        print(f"CSV saved to {output_file}")
+                    else:
+                        save_rendered(chunks, output_file)
+                        print(f"Output saved to {output_file}")
+                elif args.shards:
+                    manifest = write_shards(merged, output_file, args, input_file, merge_log)
+                    merged_count, unique_count = manifest['duplicates_merged'], manifest['contacts']
+                    print(f"Output saved to {args.shards} shards, manifest {manifest['manifest']}")
+                elif args.format == 'csv':
+                    csv_fields = [f.strip() for f in args.csv_fields.split(',')]
+                    save_csv(merged, output_file, csv_fields)
+                elif args.format == 'jsonl':
+                    save_jsonl(merged, output_file)
+                    print(f"Output saved to {output_file}")
+                else:
+                    save_vcards(merged, output_file)
+                    print(f"Output saved to {output_file}")
+        if state is not None and not state_unchanged:
+            # Saved groups describe this input only once they were merged from it
+            state['input'] = None if args.no_merge else dict(state['input'], sha256=input_digest)
+            with metrics.stage('state'):
+                save_state(args.state, state)
+    finally:
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.disable()
+    if merge_counts is not None:
+        merged_count, unique_count = merge_counts['merged'], merge_counts['unique']
+    if args.no_merge:
+        unique_count = load_stats['loaded']
+    if dup_stats is None:
+        metrics.count('write', unique_count)
+    if args.no_merge:
+        print_load_summary(load_stats)
+    print(f"Original contacts: {load_stats['loaded']}")
+    verb = 'would be ' if dup_stats is not None else ''
+    print(f"Unique contacts after merge: {unique_count}")
+    print(f"Duplicates {verb}merged: {merged_count}")
+    if args.safe_merge:
+        print("Safe merge mode: groups without shared email/phone kept separate.")
+    if merge_log is not None:
+        write_merge_log(merge_log, output_file)
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+        print(f"Profile written to {args.profile} (view with: python -m pstats {args.profile})")
+    normalized = {k: v - normalized_before[k] for k, v in normalization_stats().items()}
+    if show_metrics:
+        metrics.print_summary()
+        print(f"Normalization: {normalized['tel_normalized']} phone numbers normalized, "
+              f"{normalized['tel_reused']} repeats reused.")
+    stats = {
+        'input': input_file,
+        'output': output_file,
+        'original_contacts': load_stats['loaded'],
+        'unique_contacts': unique_count,
+        'duplicates_merged': merged_count,
+        'malformed': load_stats['malformed'],
+        'load_stats': dict(load_stats),
+        'normalization': normalized,
+    }
+    if dup_stats is not None:
+        stats['duplicate_stats'] = dup_stats
+    if manifest is not None:
+        stats['shards'] = manifest
+    if args.metrics_json:
+        write_metrics(metrics, args.metrics_json, stats)
+    stats['metrics'] = metrics.to_dict()
+    return stats
+
+# --- Merge daemon (--serve) -------------------------------------------------------
+# The address book is loaded once and kept in memory with its dedupe-key, email and
+# phone indexes; clients ask whether a card duplicates anything, add cards and
+# trigger an export. Requests are JSON objects, answered over a Unix socket (one
+# JSON object per line each way) or localhost HTTP (POST /query, /insert,
+# /export, GET /stats).
+
+# Matches listed in one response; match_count has the full number
+_MAX_MATCHES = 100
+
+class DedupeIndex:
+    """Cards with in-memory indexes on dedupe key, normalized email and phone digits."""
+
+    def __init__(self, key_fields: List[str]):
+        self.composite_key = compile_key_function(key_fields)
+        self.cards: List = []
+        self.by_key: Dict[str, List[int]] = defaultdict(list)
+        self.by_email: Dict[str, List[int]] = defaultdict(list)
+        self.by_tel: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, card) -> int:
+        card_id = len(self.cards)
+        self.cards.append(card)
+        self.by_key[self.composite_key(card)].append(card_id)
+        for email in set(card.emails):
+            self.by_email[email].append(card_id)
+        for tel in {t for t in card.tels if t.isdigit()}:
+            self.by_tel[tel].append(card_id)
+        return card_id
+
+    def matches(self, card) -> tuple:
+        """(key, {card id: [reasons]}) of the indexed cards sharing card's key, an email or a phone number."""
+        key = self.composite_key(card)
+        found: Dict[int, List[str]] = {}
+        for card_id in self.by_key.get(key, ()):
+            found[card_id] = ['key']
+        for reason, index, values in (('email', self.by_email, set(card.emails)),
+                                      ('tel', self.by_tel, {t for t in card.tels if t.isdigit()})):
+            for value in values:
+                for card_id in index.get(value, ()):
+                    reasons = found.setdefault(card_id, [])
+                    if reasons[-1:] != [reason]:
+                        reasons.append(reason)
+        return key, found
+
+class MergeDaemon:
+    """Request handling of --serve, independent of the transport.
+
+    query: {"vcard": TEXT} -> per card in TEXT, its dedupe key, whether cards
+    with that key exist ("duplicate"), whether one of them also shares an
+    email or phone number ("safe", the --safe-merge test) and the matching
+    cards. insert: the same, then adds the cards and returns their ids.
+    export: merges all cards with the run's options and writes the output
+    file. stats: card and index sizes.
+    """
+
+    def __init__(self, index: DedupeIndex, args, output_file=None):
+        import threading
+        self.index = index
+        self.args = args
+        self.output_file = output_file
+        self.lock = threading.Lock()
+        # One export at a time: they share the temporary file; queries keep running meanwhile
+        self.export_lock = threading.Lock()
+        self.requests = Counter()
+
+    def _check(self, request: Dict[str, object], insert: bool) -> Dict[str, object]:
+        text = request.get('vcard')
+        if not isinstance(text, str):
+            raise ValueError("Request needs a 'vcard' string")
+        stats = Counter()
+        errors: List[str] = []
+        cards = list(_load_card_texts(_split_card_texts(io.StringIO(text, newline=None), stats, errors.append),
+                                      stats, errors.append))
+        results = []
+        with self.lock:
+            for card in cards:
+                key, found = self.index.matches(card)
+                duplicates = [i for i, by in found.items() if 'key' in by]
+                result = {
+                    'fn': card.fn,
+                    'key': key,
+                    'duplicate': bool(duplicates),
+                    'safe': any(len(found[i]) > 1 for i in duplicates),
+                    'match_count': len(found),
+                    'matches': [{'id': i, 'fn': self.index.cards[i].fn, 'by': by}
+                                for i, by in sorted(found.items())[:_MAX_MATCHES]],
+                }
+                if insert:
+                    result['id'] = self.index.add(card)
+                results.append(result)
+        return {'results': results, 'malformed': stats['malformed'], 'errors': errors}
+
+    def export(self) -> Dict[str, object]:
+        if not self.output_file:
+            raise ValueError("No output file: start the daemon with -o to enable export")
+        args = self.args
+        with self.lock:
+            cards = list(self.index.cards)
+        key_fields = [p.strip() for p in args.dedupe_key.split(',') if p.strip()]
+        if args.cluster or args.fuzzy is not None:
+            groups = cluster_duplicates(cards, key_fields, (args.cluster or '').split(','),
+                                        fuzzy_threshold=args.fuzzy, fuzzy_blocking=args.fuzzy_blocking.split(','),
+                                        fuzzy_max_block=args.fuzzy_max_block)
+        else:
+            groups = find_duplicates(cards, key_fields)
+        merged, merged_count = merge_contacts(groups, safe_merge=args.safe_merge, jobs=args.jobs)
+        # Write next to the output and rename, so readers never see a partial file
+        root, ext = os.path.splitext(self.output_file)
+        tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.format == 'csv':
+                save_csv(merged, tmp_path, [f.strip() for f in args.csv_fields.split(',')])
+            elif args.format == 'jsonl':
+                save_jsonl(merged, tmp_path)
+            else:
+                save_vcards(merged, tmp_path)
+        os.replace(tmp_path, self.output_file)
+        print(f"Exported {len(merged)} contacts ({merged_count} duplicates merged) to {self.output_file}")
+        return {'output': self.output_file, 'original_contacts': len(cards), 'unique_contacts': len(merged),
+                'duplicates_merged': merged_count}
+
+    def stats(self) -> Dict[str, object]:
+        index = self.index
+        return {'cards': len(index.cards), 'keys': len(index.by_key), 'emails': len(index.by_email),
+                'tels': len(index.by_tel), 'requests': dict(self.requests)}
+
+    def handle(self, op: str, request: Dict[str, object]) -> Dict[str, object]:
+        """Answer one request; failures become {"error": message}."""
+        self.requests[op] += 1
+        try:
+            if op in ('query', 'insert'):
+                return self._check(request, op == 'insert')
+            if op == 'export':
+                with self.export_lock:
+                    return self.export()
+            if op == 'stats':
+                return self.stats()
+            return {'error': f"Unknown operation '{op}' (use query, insert, export or stats)"}
+        except (ValueError, OSError) as e:
+            return {'error': str(e)}
+
+def parse_serve_address(spec: str) -> tuple:
+    """('unix', path) for 'unix:PATH', or ('http', (host, port)) for '[http://]HOST:PORT' on a loopback host."""
+    if spec.startswith('unix:'):
+        if not spec[5:]:
+            raise ValueError("--serve unix: needs a socket path, e.g. unix:/tmp/merge_vcards.sock")
+        return 'unix', spec[5:]
+    host, _, port = spec.split('://', 1)[-1].rstrip('/').rpartition(':')
+    host = host or 'localhost'
+    if host != 'localhost' and not host.startswith('127.'):
+        raise ValueError(f"--serve only listens on localhost, not '{host}'")
+    try:
+        return 'http', (host, int(port))
+    except ValueError:
+        raise ValueError(f"Invalid --serve address '{spec}' (use unix:PATH or localhost:PORT)") from None
+
+def _remove_stale_socket(path: str):
+    import socket
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            os.remove(path)  # left behind by a daemon that did not shut down cleanly
+            return
+    raise ValueError(f"Another daemon is already listening on {path}")
+
+def make_server(daemon: MergeDaemon, kind: str, address):
+    """Threaded server for the Unix socket (JSON lines) or HTTP transport; call serve_forever() on it."""
+    if kind == 'unix':
+        import socketserver
+
+        class LineHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except ValueError:
+                        request = None
+                    if isinstance(request, dict):
+                        response = daemon.handle(str(request.get('op', '')), request)
+                    else:
+                        response = {'error': 'Each request line must be a JSON object'}
+                    self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        _remove_stale_socket(address)
+        server = socketserver.ThreadingUnixStreamServer(address, LineHandler)
+        server.daemon_threads = True
+        return server
+
+    import http.server
+
+    class HTTPHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive: no connection setup per request
+        # Headers and body go out in separate writes; without TCP_NODELAY the body waits for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, response: Dict[str, object]):
+            body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._reply(200, daemon.handle('stats', {}))
+            else:
+                self._reply(404, {'error': f"Unknown path '{self.path}'"})
+
+        def do_POST(self):
+            op = self.path.strip('/')
+            length = self.headers.get('Content-Length')
+            if length is None:
+                # Without a length the body cannot be told apart from the next request
+                self.close_connection = True
+                self._reply(411, {'error': 'Content-Length header required'})
+                return
+            try:
+                length = int(length)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                self._reply(400, {'error': 'Invalid Content-Length header'})
+                return
+            body = self.rfile.read(length)
+            try:
+                request = json.loads(body) if body.strip() else {}
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                self._reply(400, {'error': 'Request body must be a JSON object'})
+                return
+            response = daemon.handle(op, request)
+            self._reply(400 if 'error' in response else 200, response)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(address, HTTPHandler)
+    server.daemon_threads = True
+    return server
+
+def run_daemon(args, input_file, output_file=None):
+    """Load input_file into a DedupeIndex and serve requests on args.serve until interrupted.
+
+    Returns the daemon's final stats (see MergeDaemon.stats()).
+    """
+    if args.no_merge or args.stats_only or args.state or args.store or args.spill_dir:
+        raise ValueError("--serve cannot be combined with --no-merge, --stats-only, --state, --store or --spill-dir")
+    _check_options(args)
+    set_phone_region(args.phone_region)
+    kind, address = parse_serve_address(args.serve)
+    index = DedupeIndex([p.strip() for p in args.dedupe_key.split(',') if p.strip()])
+    daemon = MergeDaemon(index, args, output_file)
+    # Bind before loading so a busy address fails fast; clients wait in the backlog until serving starts
+    try:
+        server = make_server(daemon, kind, address)
+    except OSError as e:
+        raise ValueError(f"Cannot listen on {args.serve}: {e}") from e
+    import signal
+    import threading
+    if threading.current_thread() is threading.main_thread():
+        # Stop on kill/service manager shutdown as on Ctrl+C, so the socket file is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        cache = None
+        if args.cache_dir and not args.no_cache:
+            try:
+                cache = ParseCache(args.cache_dir, args.cache_size << 20)
+            except OSError as e:
+                print(f"Parse cache disabled: {e}")
+        print(f"Loading vCards from {input_file}...")
+        load_stats = Counter()
+        if cache is not None:
+            vcards = iter_vcards_with_cache(input_file, cache, load_stats, jobs=args.jobs,
+                                            input_format=args.input_format)
+        else:
+            vcards = iter_vcards(input_file, load_stats, jobs=args.jobs, input_format=args.input_format)
         for card in vcards:
-            writer.writerow(card_to_csv_row(card, fields_clean))
-    print(f"CSV saved to {filename}")
+            index.add(card)
+        print_load_summary(load_stats)
+        print(f"Serving {len(index.cards)} cards on {args.serve} (query, insert, export, stats). "
+              "Press Ctrl+C to stop.")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping.")
+    finally:
+        server.server_close()
+        if kind == 'unix' and os.path.exists(address):
+            os.remove(address)
+    return daemon.stats()
 
-if __name__ == "__main__":
+# --- Watch folder (--watch) -------------------------------------------------------
+# The directory is polled (os.scandir, no inotify dependency); a file counts as new
+# or changed when its size or mtime differs. Only those files are parsed. Changes are
+# applied once the directory has been quiet for one poll interval, so a burst of
+# drops costs a single rewrite of the output.
+
+# A batch is applied after this many intervals even if files keep changing
+_WATCH_MAX_DELAY = 10
+
+def scan_folder(directory: str, extension: str, skip: str = None) -> Dict[str, tuple]:
+    """{path: (size, mtime_ns)} of the files in directory ending in extension, sorted by name."""
+    found = {}
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.name.lower().endswith(extension) or entry.path == skip:
+                continue
+            try:
+                if entry.is_file():
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass  # removed while scanning
+    return found
+
+class FolderMerge:
+    """Merged output of every card file in a folder, updated one file at a time.
+
+    Cards are kept per file and grouped once; cards of new files are added to
+    the existing groups, and only groups whose members changed are merged and
+    rendered again. A changed or removed file (or --cluster/--fuzzy, whose
+    groups can join) regroups the cards in memory without parsing them again.
+    The output always equals merging the files' cards in the order the files
+    were first seen. A file that cannot be read or decoded is reported and
+    keeps its last good cards (none for a new file) until it changes again.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.key_fields = [p.strip() for p in args.dedupe_key.split(',') if p.strip()]
+        self.composite_key = compile_key_function(self.key_fields)
+        self.render = group_renderer(args)
+        self.files: Dict[str, List] = {}
+        self.signatures: Dict[str, tuple] = {}
+        self.groups: Dict[str, List] = defaultdict(list)
+        # key -> (member cards, rendered text, duplicates merged, contacts, merge log lines)
+        self.rendered: Dict[str, tuple] = {}
+
+    def update(self, changed: Dict[str, tuple], removed: List[str]) -> int:
+        """Parse changed files, drop removed ones and regroup; returns the number of cards parsed."""
+        args = self.args
+        regroup = bool(removed) or any(path in self.files for path in changed) or bool(
+            args.cluster or args.fuzzy is not None)
+        for path in removed:
+            del self.files[path], self.signatures[path]
+        new_cards = []
+        for path, signature in changed.items():
+            # Recording the signature either way retries a bad file only once it changes
+            self.signatures[path] = signature
+            try:
+                cards = list(iter_vcards(path, Counter(), jobs=args.jobs, input_format=args.input_format))
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path}: {e}")
+                if path in self.files:
+                    continue
+                cards = []
+            self.files[path] = cards
+            new_cards += cards
+        if regroup:
+            cards = [card for file_cards in self.files.values() for card in file_cards]
+            if args.cluster or args.fuzzy is not None:
+                self.groups = cluster_duplicates(cards, self.key_fields, (args.cluster or '').split(','),
+                                                 fuzzy_threshold=args.fuzzy,
+                                                 fuzzy_blocking=args.fuzzy_blocking.split(','),
+                                                 fuzzy_max_block=args.fuzzy_max_block)
+            else:
+                self.groups = find_duplicates(cards, self.key_fields)
+        else:
+            for card in new_cards:
+                self.groups[self.composite_key(card)].append(card)
+        return len(new_cards)
+
+    def write(self, output_file: str) -> Dict[str, int]:
+        """Merge the groups that changed and atomically replace output_file."""
+        chunks: List[str] = []
+        merge_log: List[str] = []
+        rendered = {}
+        counts = Counter()
+        for key, group in self.groups.items():
+            members = tuple(group)
+            entry = self.rendered.get(key)
+            if entry is None or entry[0] != members:
+                group_log: List[str] = []
+                merged, count = merge_contacts({key: group}, self.args.safe_merge, group_log)
+                entry = (members, self.render(merged), count, len(merged), group_log)
+                counts['groups_merged'] += 1
+            rendered[key] = entry
+            chunks.append(entry[1])
+            counts['merged'] += entry[2]
+            counts['unique'] += entry[3]
+            merge_log += entry[4]
+        self.rendered = rendered
+        tmp_path = output_file + '.tmp'
+        csv_fields = [f.strip() for f in self.args.csv_fields.split(',')] if self.args.format == 'csv' else None
+        save_rendered(chunks, tmp_path, csv_fields)
+        os.replace(tmp_path, output_file)
+        if self.args.log:
+            with contextlib.redirect_stdout(io.StringIO()):
+                write_merge_log(merge_log, output_file)
+        counts['groups'] = len(rendered)
+        return counts
+
+def watch_folder(args, directory: str, output_file: str, max_batches: int = None) -> Dict[str, int]:
+    """Keep output_file merged from the card files in directory until interrupted.
+
+    max_batches stops after that many updates (the first one merges the files
+    already present). Returns the last update's counts.
+    """
+    if args.input:
+        raise ValueError("--watch reads its input from the directory; do not pass -i")
+    if args.serve or args.no_merge or args.stats_only or args.state or args.store or args.spill_dir:
+        raise ValueError("--watch cannot be combined with --serve, --no-merge, --stats-only, --state, "
+                         "--store or --spill-dir")
+    if args.watch_interval <= 0:
+        raise ValueError("--watch-interval must be positive")
+    if not os.path.isdir(directory):
+        raise ValueError(f"Watch directory not found: {directory}")
+    _check_options(args)
+    set_phone_region(args.phone_region)
+    import signal
+    import threading
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    extension = '.' + args.input_format
+    # The output may live in the watched directory; never read it back as input
+    in_folder = os.path.realpath(os.path.dirname(os.path.abspath(output_file))) == os.path.realpath(directory)
+    skip = os.path.join(directory, os.path.basename(output_file)) if in_folder else None
+    folder = FolderMerge(args)
+    counts: Dict[str, int] = {}
+    batches = 0
+    print(f"Watching {directory} for {extension} files every {args.watch_interval:g} s; "
+          f"output {output_file}. Press Ctrl+C to stop.")
+    try:
+        previous = None
+        waited = 0
+        while max_batches is None or batches < max_batches:
+            current = scan_folder(directory, extension, skip)
+            if current != folder.signatures:
+                waited += 1
+                # Apply once nothing changed since the last scan (or right away on the first batch)
+                if batches == 0 or current == previous or waited >= _WATCH_MAX_DELAY:
+                    changed = {p: s for p, s in current.items() if folder.signatures.get(p) != s}
+                    removed = [p for p in folder.signatures if p not in current]
+                    new = sum(1 for p in changed if p not in folder.files)
+                    parsed = folder.update(changed, removed)
+                    counts = folder.write(output_file)
+                    batches += 1
+                    waited = 0
+                    print(f"[{time.strftime('%H:%M:%S')}] {new} new, {len(changed) - new} changed, "
+                          f"{len(removed)} removed files ({parsed} cards parsed): {counts['unique']} contacts, "
+                          f"{counts['merged']} duplicates merged, {counts['groups_merged']} of {counts['groups']} "
+                          f"groups merged again")
+            else:
+                waited = 0
+            previous = current
+            if max_batches is None or batches < max_batches:
+                time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        print("Stopping.")
+    return counts
+
+# --- Command line ----------------------------------------------------------------
+
+def main():
     args = parse_args()
 
     # Determine if interactive wizard should run
@@ -374,7 +3337,7 @@ if __name__ == "__main__":
             print("Input stream closed; continuing with defaults.")
 
     # Determine input / output via CLI or GUI
-    input_file = args.input
+    input_file = args.input or args.watch
     if not input_file:
         if args.no_gui or args.console:
             print("Input file not provided and GUI disabled (--no-gui). Exiting.")
@@ -385,55 +3348,37 @@ if __name__ == "__main__":
         exit(1)
 
     output_file = args.output
-    if not output_file:
-        if args.no_gui or args.console:
-            print("Output file not provided and GUI disabled (--no-gui). Exiting.")
+    if args.stats_only or args.stats_json:
+        # Nothing is written, so no output file is needed
+        output_file = None
+    elif args.serve and not output_file:
+        # The daemon only writes on export, which then reports the missing -o
+        pass
+    else:
+        if not output_file:
+            if args.no_gui or args.console:
+                print("Output file not provided and GUI disabled (--no-gui). Exiting.")
+                exit(1)
+            # Suggest default name based on input
+            base_name = os.path.splitext(os.path.basename(os.path.normpath(input_file)))[0]
+            output_file = select_output_file(default_name=f"{base_name}.merged.{args.format}", fmt=args.format)
+        if not output_file:
+            print("No output file selected. Exiting.")
             exit(1)
-        # Suggest default name based on input
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        if args.format == 'csv':
-            output_file = select_output_file(default_name=f"{base_name}.merged.csv", fmt='csv')
-        else:
-            output_file = select_output_file(default_name=f"{base_name}.merged.vcf", fmt='vcf')
-    if not output_file:
-        print("No output file selected. Exiting.")
-        exit(1)
 
-    # If user provided an output without extension, add based on format
-    if '.' not in os.path.basename(output_file):
-        output_file = output_file + ('.csv' if args.format == 'csv' else '.vcf')
-    # If mismatch extension vs format, adjust
-    if args.format == 'csv' and not output_file.lower().endswith('.csv'):
-        output_file = os.path.splitext(output_file)[0] + '.csv'
-    if args.format == 'vcf' and not output_file.lower().endswith('.vcf'):
-        output_file = os.path.splitext(output_file)[0] + '.vcf'
+        # Add or fix the extension to match the format
+        output_file = output_path(output_file, args.format)
 
-    print(f"Loading vCards from {input_file}...")
-    vcards, malformed = load_vcards(input_file)
-    print(f"Loaded {len(vcards)} valid vCards. Skipped {malformed} malformed or missing-name cards.")
-
-    key_fields = [p.strip() for p in args.dedupe_key.split(',') if p.strip()]
-    contacts = find_duplicates(vcards, key_fields)
-
-    merge_log: List[str] = [] if args.log else None
-    if args.no_merge:
-        merged = vcards
-        merged_count = 0
-        if merge_log is not None:
-            merge_log.append("Merging disabled (--no-merge)")
-    else:
-        merged, merged_count = merge_contacts(contacts, safe_merge=args.safe_merge, merge_log=merge_log)
+    try:
+        if args.watch:
+            watch_folder(args, args.watch, output_file)
+        elif args.serve:
+            run_daemon(args, input_file, output_file)
+        else:
+            run_merge(args, input_file, output_file)
+    except ValueError as e:
+        print(f"{e}. Exiting.")
+        exit(1)
 
-    if args.format == 'csv':
-        csv_fields = [f.strip() for f in args.csv_fields.split(',')]
-        save_csv(merged, output_file, csv_fields)
-    else:
-        save_vcards(merged, output_file)
-        print(f"Output saved to {output_file}")
-    print(f"Original contacts: {len(vcards)}")
-    print(f"Unique contacts after merge: {len(merged)}")
-    print(f"Duplicates merged: {merged_count}")
-    if args.safe_merge:
-        print("Safe merge mode: groups without shared email/phone kept separate.")
-    if merge_log is not None:
-        write_merge_log(merge_log, output_file)
\ No newline at end of file
+if __name__ == "__main__":
+    main()